@@ -5,20 +5,30 @@ This module provides AI-powered generation of mock MCP servers and evaluation te
 
 Main components:
 - ai_service: Core Claude CLI interface
+- cache: On-disk cache for AI generation results
 - cli: Main command-line interface
 - server_generator: Generates mock MCP servers
 - evals_generator: Generates evaluation test cases
 - evaluation_runner: Runs evaluations against servers
+- tool_info: Shared tool condensing and deduplication helpers
 """
 
-from .ai_service import AIService, test_claude_cli
+from .ai_service import AIService, get_ai_service, test_claude_cli
 from .evals_generator import generate_ai_test_cases
-from .server_generator import generate_ai_mock_responses, generate_ai_mock_server
+from .server_generator import (
+    generate_ai_all,
+    generate_ai_mock_payloads,
+    generate_ai_mock_responses,
+    generate_ai_mock_server,
+)
 
 __all__ = [
     "AIService",
+    "get_ai_service",
     "test_claude_cli", 
+    "generate_ai_all",
     "generate_ai_mock_server",
+    "generate_ai_mock_payloads",
     "generate_ai_mock_responses",
     "generate_ai_test_cases",
 ]
\ No newline at end of file
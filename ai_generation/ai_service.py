@@ -9,7 +9,27 @@ structured responses.
 import json
 import re
 import subprocess
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
+
+from .cache import cache_enabled, cache_key, read_cache, write_cache
+
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def dumps_json(obj: Any) -> str:
+        """Serialize obj to compact JSON for a prompt."""
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    _loads = json.loads
+
+    def dumps_json(obj: Any) -> str:
+        """Serialize obj to compact JSON for a prompt."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+# Cache namespace for Claude CLI responses that parsed and validated, keyed by prompt text
+_RESPONSE_CACHE = "claude_responses"
 
 
 class ClaudeError(Exception):
@@ -62,9 +82,13 @@ class AIService:
         """
         if not prompt or not prompt.strip():
             raise ValueError("Prompt cannot be empty or None")
+        
         try:
+            # Feed the prompt over stdin in print mode rather than as argv:
+            # large tool sets exceed the kernel's per-argument size limit
             result = subprocess.run(
-                ["claude", prompt],
+                ["claude", "-p"],
+                input=prompt,
                 capture_output=True,
                 text=True,
                 timeout=self.timeout
@@ -73,12 +97,14 @@ class AIService:
             if result.returncode != 0:
                 raise ClaudeExecutionError(f"Claude CLI failed: {result.stderr}")
             
-            return result.stdout.strip()
+            response = result.stdout.strip()
         
         except subprocess.TimeoutExpired:
             raise ClaudeTimeoutError(f"Claude CLI call timed out after {self.timeout} seconds")
         except FileNotFoundError:
             raise ClaudeNotFoundError("Claude CLI not found. Please ensure 'claude' is installed and in PATH")
+        
+        return response
     
     def clean_json_response(self, response: str) -> str:
         """
@@ -95,28 +121,66 @@ class AIService:
         cleaned = re.sub(r'\s*```$', '', cleaned, flags=re.MULTILINE)
         return cleaned.strip()
     
-    def generate_json(self, prompt: str) -> Dict[str, Any]:
+    def generate_json(self, prompt: str, validate: Optional[Callable[[Any], None]] = None) -> Dict[str, Any]:
         """
         Generate a JSON response from Claude and parse it.
         
+        Responses are cached on disk keyed by the exact prompt text, so a
+        repeated prompt skips the CLI round-trip entirely (set
+        EXPLORE_MCP_CACHE=0 to disable). Only responses that parse, and pass
+        validate if given, are cached; a cached entry that no longer does is
+        replaced by a fresh call.
+        
         Args:
             prompt: The prompt to send to Claude
+            validate: Called with the parsed response; raises ValueError
+                if the response doesn't have the shape the caller needs
             
         Returns:
             Parsed JSON as a dictionary
             
         Raises:
-            ValueError: If prompt is empty or None
+            ValueError: If prompt is empty or None, or validate rejects the response
             json.JSONDecodeError: If response cannot be parsed as JSON
             ClaudeTimeoutError: If Claude CLI call times out
             ClaudeNotFoundError: If Claude CLI is not found in PATH
             ClaudeExecutionError: If Claude CLI returns non-zero exit code
         """
+        use_cache = cache_enabled()
+        if use_cache:
+            key = cache_key(prompt)
+            cached = read_cache(_RESPONSE_CACHE, key)
+            if cached is not None:
+                try:
+                    return self._parse_json(cached, validate)
+                except ValueError:
+                    pass  # unusable entry; ask Claude again
+        
         response = self.call_claude(prompt)
-        cleaned_response = self.clean_json_response(response)
+        result = self._parse_json(response, validate)
+        if use_cache:
+            write_cache(_RESPONSE_CACHE, key, response)
+        return result
+    
+    def _parse_json(self, response: str, validate: Optional[Callable[[Any], None]] = None) -> Any:
+        """Parse a response as JSON and run validate on the result."""
+        result = self._loads_response(response)
+        if validate is not None:
+            validate(result)
+        return result
+    
+    def _loads_response(self, response: str) -> Any:
+        """Parse a response as JSON, stripping markdown fences if needed."""
+        # Prompts ask for raw JSON, so parse directly and only strip
+        # markdown fences when Claude added them anyway
+        try:
+            return _loads(response)
+        except json.JSONDecodeError:
+            pass
         
+        cleaned_response = self.clean_json_response(response)
         try:
-            return json.loads(cleaned_response)
+            return _loads(cleaned_response)
         except json.JSONDecodeError as e:
             # Add context to the error
             raise json.JSONDecodeError(
@@ -126,6 +190,25 @@ class AIService:
             )
 
 
+_default_service: Optional[AIService] = None
+
+
+def get_ai_service() -> AIService:
+    """
+    Get the shared AIService instance, creating it on first use.
+    
+    AIService holds no per-call state, so generators reuse one instance
+    instead of constructing a new one for every Claude call.
+    
+    Returns:
+        The process-wide AIService
+    """
+    global _default_service
+    if _default_service is None:
+        _default_service = AIService()
+    return _default_service
+
+
 def test_claude_cli() -> bool:
     """
     Test if Claude CLI is available and working.
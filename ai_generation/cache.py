@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Disk Cache - Content-addressed on-disk cache for AI generation results.
+
+Repeated generations against an unchanged server send Claude byte-identical
+inputs, so their results can be reused instead of paying for another CLI call.
+
+Cache layout:
+    ~/.cache/explore-mcp/
+    ├── claude_responses/
+    │   ├── 3f2a...e1.json  # blake2b of the exact prompt text
+    │   └── ...
+    ├── mock_tool_responses/  # one entry per tool, so editing one tool
+    │   └── ...               # doesn't invalidate the others
+    └── ...
+
+Set EXPLORE_MCP_CACHE=0 to bypass the cache entirely.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+
+    def _canonical_json(payload: Any) -> bytes:
+        """Serialize payload to sorted, compact JSON bytes."""
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    def _canonical_json(payload: Any) -> bytes:
+        """Serialize payload to sorted, compact JSON bytes."""
+        return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def cache_enabled() -> bool:
+    """Whether the on-disk cache is enabled (EXPLORE_MCP_CACHE != '0')."""
+    return os.getenv("EXPLORE_MCP_CACHE", "1") != "0"
+
+
+def get_cache_dir(namespace: str) -> Path:
+    """
+    Get the cache directory for a namespace.
+
+    Honors XDG_CACHE_HOME, falling back to ~/.cache.
+
+    Args:
+        namespace: Subdirectory name, e.g. 'claude_responses'
+
+    Returns:
+        Path to the namespace directory (not created)
+    """
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "explore-mcp" / namespace
+
+
+def cache_key(payload: Any, version: str = "") -> str:
+    """
+    Compute a stable cache key for JSON-serializable inputs.
+
+    Args:
+        payload: Inputs to hash; serialized as sorted, compact JSON
+        version: Extra discriminator, e.g. the prompt version
+
+    Returns:
+        128-bit blake2b hex digest
+    """
+    digest = hashlib.blake2b(_canonical_json(payload), digest_size=16)
+    digest.update(version.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_cache(namespace: str, key: str) -> Optional[Any]:
+    """Return the cached value for key, or None on a miss or unreadable entry."""
+    path = get_cache_dir(namespace) / f"{key}.json"
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache(namespace: str, key: str, value: Any) -> None:
+    """
+    Atomically store a value for key.
+
+    Writes to a temp file in the same directory and renames it into place,
+    so concurrent readers never observe a partial entry. Failures are
+    ignored; the cache is an optimization only.
+    """
+    cache_dir = get_cache_dir(namespace)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, cache_dir / f"{key}.json")
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
+
+def read_many(namespace: str, keys: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Look up several entries at once.
+    
+    Args:
+        namespace: Cache subdirectory
+        keys: Mapping of item name to cache key
+        
+    Returns:
+        Mapping of item name to cached value for the hits only
+        (always empty when the cache is disabled)
+    """
+    if not cache_enabled():
+        return {}
+    hits = {}
+    for name, key in keys.items():
+        value = read_cache(namespace, key)
+        if value is not None:
+            hits[name] = value
+    return hits
+
+
+def write_many(namespace: str, keys: Dict[str, str], values: Dict[str, Any]) -> None:
+    """Store each value under keys[name]; names without a key are skipped."""
+    if not cache_enabled():
+        return
+    for name, value in values.items():
+        key = keys.get(name)
+        if key is not None:
+            write_cache(namespace, key, value)
+
@@ -8,12 +8,20 @@ for working with discovery results from MCP servers.
 
 import hashlib
 import json
+import logging
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator, model_serializer
+
+logger = logging.getLogger(__name__)
+
+
+def _short_hash(value: Optional[str]) -> str:
+    """Shorten a hash for display, or return 'N/A' when it is missing."""
+    return f"{value[:8]}..." if value else "N/A"
 
 
 class ToolSchema(BaseModel):
@@ -27,32 +35,57 @@ class ToolSchema(BaseModel):
     enum: Optional[List[Any]] = None
 
 
-class MCPTool(BaseModel):
+class _DiscoveredItem(BaseModel):
+    """
+    Base for tools, resources and prompts reported by the Inspector.
+    
+    Optional MCP spec fields are typed attributes rather than extras, so
+    instances carry no __pydantic_extra__ dict. Unknown fields are ignored.
+    Spec fields listed in _omit_if_none are dropped from dumps when unset,
+    keeping the output (and discovery_content_hash) identical to what the
+    old extra="allow" models produced.
+    """
+    _omit_if_none: ClassVar[Tuple[str, ...]] = ()
+
+    model_config = ConfigDict(
+        extra="ignore",
+        populate_by_name=True  # Allow both 'meta' and '_meta'
+    )
+
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler):
+        data = handler(self)
+        for key in self._omit_if_none:
+            if data.get(key) is None:
+                data.pop(key, None)
+        return data
+
+
+class MCPTool(_DiscoveredItem):
     """Represents a discovered MCP tool."""
     name: str = Field(..., description="Tool name")
     description: str = Field(..., description="Tool description")
     inputSchema: Dict[str, Any] = Field(..., description="JSON Schema for tool input")
     outputSchema: Optional[Dict[str, Any]] = Field(None, description="JSON Schema for tool output")
     meta: Optional[Dict[str, Any]] = Field(None, description="Tool metadata (e.g., FastMCP tags)", alias="_meta")
+    title: Optional[str] = Field(None, description="Human-readable tool title")
+    annotations: Optional[Dict[str, Any]] = Field(None, description="Tool behavior hints (readOnlyHint, etc.)")
 
-    model_config = ConfigDict(
-        extra="allow",  # Allow extra fields from Inspector
-        populate_by_name=True  # Allow both 'meta' and '_meta'
-    )
+    _omit_if_none: ClassVar[Tuple[str, ...]] = ("title", "annotations")
 
 
-class MCPResource(BaseModel):
+class MCPResource(_DiscoveredItem):
     """Represents a discovered MCP resource."""
     uri: str = Field(..., description="Resource URI")
     name: str = Field(..., description="Resource name")
     description: Optional[str] = Field(None, description="Resource description")
     mimeType: Optional[str] = Field(None, description="MIME type of resource content")
     meta: Optional[Dict[str, Any]] = Field(None, description="Resource metadata", alias="_meta")
+    title: Optional[str] = Field(None, description="Human-readable resource title")
+    size: Optional[int] = Field(None, description="Resource size in bytes")
+    annotations: Optional[Dict[str, Any]] = Field(None, description="Resource annotations (audience, priority)")
 
-    model_config = ConfigDict(
-        extra="allow",
-        populate_by_name=True
-    )
+    _omit_if_none: ClassVar[Tuple[str, ...]] = ("title", "size", "annotations")
 
 
 class PromptArgument(BaseModel):
@@ -62,17 +95,15 @@ class PromptArgument(BaseModel):
     required: bool = Field(True, description="Whether argument is required")
 
 
-class MCPPrompt(BaseModel):
+class MCPPrompt(_DiscoveredItem):
     """Represents a discovered MCP prompt."""
     name: str = Field(..., description="Prompt name")
     description: str = Field(..., description="Prompt description")
     arguments: List[PromptArgument] = Field(default_factory=list, description="Prompt arguments")
     meta: Optional[Dict[str, Any]] = Field(None, description="Prompt metadata", alias="_meta")
+    title: Optional[str] = Field(None, description="Human-readable prompt title")
 
-    model_config = ConfigDict(
-        extra="allow",
-        populate_by_name=True
-    )
+    _omit_if_none: ClassVar[Tuple[str, ...]] = ("title",)
 
 
 class ServerInfo(BaseModel):
@@ -148,9 +179,36 @@ class DiscoveryResult(BaseModel):
         """Whether this result came from cache."""
         return self.metadata.cache_hit
 
+    # Tools keyed by name for get_tool_by_name(), rebuilt whenever tools is
+    # replaced (assignment or model_copy); in-place edits of the list need a
+    # reassignment to be seen
+    _tools_by_name: Dict[str, MCPTool] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._index_tools()
+
+    def _index_tools(self) -> None:
+        """Rebuild the name index; the first tool with a name wins."""
+        index = {}
+        for tool in self.tools:
+            index.setdefault(tool.name, tool)
+        self._tools_by_name = index
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == "tools":
+            self._index_tools()
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "DiscoveryResult":
+        # model_copy sets fields directly and copies the private index as-is,
+        # so an update to tools would otherwise leave it stale
+        copy = super().model_copy(update=update, deep=deep)
+        copy._index_tools()
+        return copy
+
     def get_tool_by_name(self, name: str) -> Optional[MCPTool]:
         """Get a tool by name."""
-        return next((tool for tool in self.tools if tool.name == name), None)
+        return self._tools_by_name.get(name)
 
     def get_tool_names(self) -> List[str]:
         """Get list of all tool names."""
@@ -158,17 +216,17 @@ class DiscoveryResult(BaseModel):
 
     def summary(self) -> str:
         """Get a human-readable summary of the discovery."""
-        return (
-            f"Discovery of {self.server_path}:\n"
-            f"  Transport: {self.transport}\n"
-            f"  Tools: {self.tool_count}\n"
-            f"  Resources: {self.resource_count}\n"
-            f"  Prompts: {self.prompt_count}\n"
-            f"  Cached: {self.is_cached}\n"
-            f"  Discovery time: {self.metadata.discovery_time_ms}ms\n"
-            f"  Server file hash: {self.server_file_hash[:8] + '...' if self.server_file_hash else 'N/A'}\n"
-            f"  Discovery hash: {self.discovery_content_hash[:8] + '...' if self.discovery_content_hash else 'N/A'}"
-        )
+        return "\n".join((
+            f"Discovery of {self.server_path}:",
+            f"  Transport: {self.transport}",
+            f"  Tools: {self.tool_count}",
+            f"  Resources: {self.resource_count}",
+            f"  Prompts: {self.prompt_count}",
+            f"  Cached: {self.is_cached}",
+            f"  Discovery time: {self.metadata.discovery_time_ms}ms",
+            f"  Server file hash: {_short_hash(self.server_file_hash)}",
+            f"  Discovery hash: {_short_hash(self.discovery_content_hash)}",
+        ))
 
     @staticmethod
     def compute_file_hash(file_path: str) -> str:
@@ -249,7 +307,7 @@ class DiscoveryResult(BaseModel):
         with open(path, "w") as f:
             json.dump(self.model_dump(), f, indent=2, default=str)
         
-        print(f"💾 Saved discovery data to: {path}")
+        logger.info("Saved discovery data to: %s", path)
         return path
 
     model_config = {
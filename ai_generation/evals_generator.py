@@ -5,11 +5,25 @@ MCP Test Generator - Generates comprehensive test cases for MCP tools.
 Uses AI to create intelligent test cases including edge cases and domain-specific scenarios.
 """
 
-import json
-from typing import Any, Dict, List
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 
-from .ai_service import AIService
-from .prompts import format_prompt
+from .ai_service import dumps_json, get_ai_service
+from .cache import cache_key, read_many, write_many
+from .prompts import format_prompt, get_metadata
+from .tool_info import build_tools_info, group_identical_tools
+
+logger = logging.getLogger(__name__)
+
+# Keys every generated test case must carry for the evaluation runner
+_REQUIRED_CASE_KEYS = ("id", "type", "params", "expected_result")
+
+# Per-tool cache namespace, so editing one tool doesn't invalidate the rest
+_TEST_CASE_CACHE = "test_cases"
+
+# Upper bound on simultaneous Claude CLI processes in the per-tool fallback
+_MAX_CONCURRENT_CALLS = 4
 
 
 def generate_ai_test_cases(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -25,78 +39,196 @@ def generate_ai_test_cases(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     print("🤖 Generating AI-powered test cases...")
     
     # Prepare tool information for Claude
-    tools_info = []
-    for tool in tools:
-        tool_info = {
-            "name": tool["name"],
-            "description": tool["description"],
-            "schema": tool.get("inputSchema", {})
-        }
-        tools_info.append(tool_info)
+    tools_info = build_tools_info(tools)
+    
+    # Only send one representative per group of identical tools
+    unique_tools_info, duplicates = group_identical_tools(tools_info)
+    if len(unique_tools_info) < len(tools_info):
+        print(f"♻️  Collapsed {len(tools_info)} tools into {len(unique_tools_info)} unique schemas")
+    
+    # Reuse cached per-tool results; only tools whose definition changed
+    # (or that are new) go to Claude
+    tool_keys = _test_case_cache_keys(unique_tools_info)
+    cached = read_many(_TEST_CASE_CACHE, tool_keys)
+    missing_tools_info = [info for info in unique_tools_info if info["name"] not in cached]
+    if cached:
+        print(f"♻️  Reusing cached test cases for {len(cached)} tools")
+    
+    generated = _generate_test_cases(missing_tools_info) if missing_tools_info else []
+    write_many(_TEST_CASE_CACHE, tool_keys, {
+        tool_tests["tool"]: tool_tests for tool_tests in generated
+    })
+    
+    test_cases = _merge_test_cases(unique_tools_info, cached, generated)
+    return _fan_out_test_cases(test_cases, duplicates)
+
+
+def _test_case_cache_keys(tools_info: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Per-tool cache keys: the tool's definition plus the test_cases prompt version."""
+    version = get_metadata("test_cases")["version"]
+    return {info["name"]: cache_key(info, version) for info in tools_info}
+
+
+def _merge_test_cases(
+    tools_info: List[Dict[str, Any]],
+    cached: Dict[str, Dict[str, Any]],
+    generated: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Combine cached and freshly generated test case entries.
+    
+    Entries follow the tools_info order, then any extra entries Claude
+    returned; a generated entry replaces a cached one for the same tool.
+    """
+    by_tool = dict(cached)
+    by_tool.update((tool_tests["tool"], tool_tests) for tool_tests in generated)
+    test_cases = [by_tool.pop(info["name"]) for info in tools_info if info["name"] in by_tool]
+    test_cases.extend(by_tool.values())
+    return test_cases
+
+
+def _generate_test_cases(tools_info: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Generate test cases for tools_info, in bulk with a per-tool fallback."""
+    # Serialize each tool once; both generation paths reuse the same text
+    bulk_payload, per_tool_payloads = _serialize_tools_info(tools_info)
     
     # Try bulk generation first
     try:
-        return _generate_bulk_test_cases(tools_info)
+        return _generate_bulk_test_cases(bulk_payload)
     except Exception as e:
         print(f"⚠️  Bulk generation failed: {e}")
         print("🔄 Falling back to per-tool generation...")
-        return _generate_per_tool_test_cases(tools_info)
+        return _generate_per_tool_test_cases(tools_info, per_tool_payloads)
 
 
-def _generate_bulk_test_cases(tools_info: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _fan_out_test_cases(
+    test_cases: List[Dict[str, Any]],
+    duplicates: Dict[str, List[str]]
+) -> List[Dict[str, Any]]:
+    """Clone the representative's test cases to every duplicate tool name."""
+    if not duplicates:
+        return test_cases
+    
+    expanded = []
+    for tool_tests in test_cases:
+        expanded.append(tool_tests)
+        rep_name = tool_tests.get("tool")
+        for dup_name in duplicates.get(rep_name, []):
+            cloned_cases = []
+            for case in tool_tests.get("test_cases", []):
+                cloned = dict(case)
+                case_id = str(case.get("id", ""))
+                if case_id.startswith(rep_name):
+                    cloned["id"] = dup_name + case_id[len(rep_name):]
+                else:
+                    cloned["id"] = f"{dup_name}_{case_id}"
+                cloned_cases.append(cloned)
+            expanded.append({**tool_tests, "tool": dup_name, "test_cases": cloned_cases})
+    
+    return expanded
+
+
+def _validate_test_cases(test_cases: Any) -> None:
+    """
+    Check that Claude's response has the expected test-case-list shape.
+    
+    Raises:
+        ValueError: If the response is not a list of tool entries with
+            well-formed test cases
+    """
+    if not isinstance(test_cases, list):
+        raise ValueError(f"Expected list but got {type(test_cases).__name__}")
+    
+    for tool_tests in test_cases:
+        if not isinstance(tool_tests, dict) or not isinstance(tool_tests.get("tool"), str):
+            raise ValueError(f"Test case entry is missing a tool name: {tool_tests!r:.100}")
+        cases = tool_tests.get("test_cases")
+        if not isinstance(cases, list):
+            raise ValueError(f"Expected a test_cases list for {tool_tests['tool']}")
+        for case in cases:
+            if not isinstance(case, dict):
+                raise ValueError(f"Malformed test case for {tool_tests['tool']}: {case!r:.100}")
+            missing = [key for key in _REQUIRED_CASE_KEYS if key not in case]
+            if missing:
+                raise ValueError(f"Test case for {tool_tests['tool']} missing fields: {missing}")
+            if not isinstance(case["params"], dict):
+                raise ValueError(f"Test case {case['id']} params must be an object")
+
+
+def _serialize_tools_info(tools_info: List[Dict[str, Any]]) -> Tuple[str, List[str]]:
+    """
+    Serialize tools for the bulk prompt and the per-tool fallback prompts.
+    
+    Each tool is dumped exactly once, as compact JSON; Claude doesn't need
+    the indentation and it only costs tokens.
+    
+    Returns:
+        tuple: (bulk payload, list of single-tool payloads in the same order)
+    """
+    items = [dumps_json(tool_info) for tool_info in tools_info]
+    per_tool_payloads = [f"[{item}]" for item in items]
+    bulk_payload = "[" + ",".join(items) + "]"
+    return bulk_payload, per_tool_payloads
+
+
+def _generate_bulk_test_cases(tools_json: str) -> List[Dict[str, Any]]:
     """Generate test cases for all tools at once."""
     # Format the prompt
-    prompt = format_prompt(
-        "test_cases",
-        tools_json=json.dumps(tools_info, indent=2)
-    )
+    prompt = format_prompt("test_cases", tools_json=tools_json)
     
     # Use AIService to generate response
-    service = AIService()
-    test_cases = service.generate_json(prompt)
-    
-    # Validate that we got a list
-    if not isinstance(test_cases, list):
-        raise Exception(f"Expected list but got {type(test_cases)}")
+    # Reject malformed output before it reaches the evaluation runner (or the cache)
+    test_cases = get_ai_service().generate_json(prompt, validate=_validate_test_cases)
     
     total_cases = sum(len(tool_tests.get("test_cases", [])) for tool_tests in test_cases)
     print(f"✅ Generated {total_cases} AI test cases across {len(test_cases)} tools")
     return test_cases
 
 
-def _generate_per_tool_test_cases(tools_info: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Generate test cases one tool at a time as fallback."""
-    all_test_cases = []
-    service = AIService()
-    
-    for tool_info in tools_info:
-        try:
-            print(f"🔧 Generating test cases for {tool_info['name']}...")
-            
-            # Create prompt for single tool
-            prompt = format_prompt(
-                "test_cases",
-                tools_json=json.dumps([tool_info], indent=2)
-            )
-            
-            tool_test_cases = service.generate_json(prompt)
-            
-            if isinstance(tool_test_cases, list) and len(tool_test_cases) > 0:
-                all_test_cases.extend(tool_test_cases)
-                case_count = len(tool_test_cases[0].get("test_cases", []))
-                print(f"✅ Generated {case_count} test cases for {tool_info['name']}")
-            else:
-                print(f"⚠️  No test cases generated for {tool_info['name']}")
-                
-        except Exception as e:
-            print(f"⚠️  Failed to generate test cases for {tool_info['name']}: {e}")
-            continue
+def _generate_per_tool_test_cases(
+    tools_info: List[Dict[str, Any]],
+    per_tool_payloads: List[str]
+) -> List[Dict[str, Any]]:
+    """
+    Generate test cases one tool at a time as fallback.
+    
+    Each tool is an independent Claude CLI call, so they run concurrently
+    on a small thread pool; results keep the input tool order.
+    """
+    names = [tool_info['name'] for tool_info in tools_info]
+    max_workers = max(1, min(_MAX_CONCURRENT_CALLS, len(names)))
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_generate_single_tool_test_cases, names, per_tool_payloads)
+        all_test_cases = [tool_tests for tool_results in results for tool_tests in tool_results]
     
     total_cases = sum(len(tool_tests.get("test_cases", [])) for tool_tests in all_test_cases)
     print(f"✅ Generated {total_cases} total AI test cases across {len(all_test_cases)} tools")
     return all_test_cases
 
 
+def _generate_single_tool_test_cases(tool_name: str, tool_json: str) -> List[Dict[str, Any]]:
+    """Generate test cases for one tool, returning [] if generation fails."""
+    try:
+        logger.info("Generating test cases for %s", tool_name)
+        
+        # Create prompt for single tool
+        prompt = format_prompt("test_cases", tools_json=tool_json)
+        
+        tool_test_cases = get_ai_service().generate_json(prompt, validate=_validate_test_cases)
+        
+        if len(tool_test_cases) > 0:
+            case_count = len(tool_test_cases[0].get("test_cases", []))
+            logger.info("Generated %d test cases for %s", case_count, tool_name)
+        else:
+            logger.warning("No test cases generated for %s", tool_name)
+        return tool_test_cases
+        
+    except Exception as e:
+        logger.warning("Failed to generate test cases for %s: %s", tool_name, e)
+        return []
+
+
 if __name__ == "__main__":
     # Test with sample tools
     import sys
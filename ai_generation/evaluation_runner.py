@@ -26,6 +26,7 @@ from typing import Any, Dict, List, Tuple
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.types import TextContent
 
 
 def get_mock_server_params(server_path: str = "generated/mock_server.py") -> StdioServerParameters:
@@ -68,11 +69,9 @@ async def run_test_case(session: ClientSession, test_case: Dict[str, Any], tool_
         response = await session.call_tool(tool_name, params)
         
         # Extract response text
-        response_text = ""
-        if response.content:
-            for content in response.content:
-                if hasattr(content, 'text'):
-                    response_text += content.text
+        response_text = "".join(
+            content.text for content in response.content or () if isinstance(content, TextContent)
+        )
         
         result["response"] = response_text
         result["call_success"] = True
@@ -178,9 +177,12 @@ async def run_evaluations(eval_path: str, server_path: str) -> Dict[str, Any]:
                     print(f"  ⚠️  Tool '{tool_name}' not found in mock server, skipping...")
                     continue
                 
-                # Run each test case
-                for test_case in test_cases:
-                    result = await run_test_case(session, test_case, tool_name)
+                # Test cases are independent; run them concurrently over the
+                # one session (results keep the test case order)
+                results = await asyncio.gather(*(
+                    run_test_case(session, test_case, tool_name) for test_case in test_cases
+                ))
+                for result in results:
                     tool_results["test_results"].append(result)
                     
                     # Update summary
@@ -13,9 +13,18 @@ IMPORTANT: Prompt Version Control Rules
 """
 
 import json
+import os
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+try:
+    import fastjsonschema
+except ImportError:  # optional; fall back to checking required fields only
+    fastjsonschema = None
+
+# Fields every prompt file must define (mirrors "required" in schema.json)
+_REQUIRED_FIELDS = ('name', 'version', 'template', 'variables')
 
 
 class PromptLoader:
@@ -25,16 +34,23 @@ class PromptLoader:
         """Initialize the prompt loader with the prompts directory."""
         self.prompts_dir = Path(__file__).parent
         self._cache: Dict[str, Dict[str, Any]] = {}
+        self._required_vars: Dict[str, FrozenSet[str]] = {}
+        self._listing_cache: Optional[Tuple[int, List[str]]] = None
         self._load_schema()
     
     def _load_schema(self) -> None:
-        """Load the JSON schema for validation."""
+        """Load the JSON schema and compile it once when fastjsonschema is available."""
         schema_path = self.prompts_dir / "schema.json"
         if schema_path.exists():
             with open(schema_path, 'r') as f:
                 self.schema = json.load(f)
         else:
             self.schema = None
+        
+        if self.schema and fastjsonschema is not None:
+            self._validator = fastjsonschema.compile(self.schema)
+        else:
+            self._validator = None
     
     def load_prompt(self, name: str) -> Dict[str, Any]:
         """
@@ -64,23 +80,33 @@ class PromptLoader:
         # Basic validation
         self._validate_prompt(prompt_data)
         
-        # Cache the loaded prompt
+        # Cache the loaded prompt and its required variables
         self._cache[name] = prompt_data
+        self._required_vars[name] = frozenset(prompt_data.get('variables', []))
         
         return prompt_data
     
     def _validate_prompt(self, prompt_data: Dict[str, Any]) -> None:
         """
-        Validate prompt data against required fields.
+        Validate prompt data against schema.json, or just its required fields
+        when fastjsonschema isn't installed.
+        
+        Only called on a cache miss; cached prompts are never revalidated.
         
         Args:
             prompt_data: The prompt data to validate
             
         Raises:
-            ValueError: If required fields are missing
+            ValueError: If required fields are missing or the schema check fails
         """
-        required_fields = ['name', 'version', 'template', 'variables']
-        missing_fields = [field for field in required_fields if field not in prompt_data]
+        if self._validator is not None:
+            try:
+                self._validator(prompt_data)
+            except fastjsonschema.JsonSchemaException as e:
+                raise ValueError(f"Prompt failed schema validation: {e.message}") from e
+            return
+        
+        missing_fields = [field for field in _REQUIRED_FIELDS if field not in prompt_data]
         
         if missing_fields:
             raise ValueError(f"Prompt missing required fields: {missing_fields}")
@@ -104,12 +130,10 @@ class PromptLoader:
         template = prompt_data['template']
         
         # Check that all required variables are provided
-        required_vars = set(prompt_data.get('variables', []))
-        provided_vars = set(kwargs.keys())
-        missing_vars = required_vars - provided_vars
+        missing_vars = self._required_vars[name].difference(kwargs)
         
         if missing_vars:
-            raise KeyError(f"Missing required template variables: {missing_vars}")
+            raise KeyError(f"Missing required template variables: {set(missing_vars)}")
         
         return template.format(**kwargs)
     
@@ -131,11 +155,23 @@ class PromptLoader:
         """
         List all available prompts.
         
+        The directory is only rescanned when its mtime changes.
+        
         Returns:
             List of prompt names (without .json extension)
         """
-        json_files = self.prompts_dir.glob("*.json")
-        return [f.stem for f in json_files if f.stem != "schema"]
+        mtime = self.prompts_dir.stat().st_mtime_ns
+        if self._listing_cache is not None and self._listing_cache[0] == mtime:
+            return list(self._listing_cache[1])
+        
+        with os.scandir(self.prompts_dir) as entries:
+            names = [
+                entry.name[:-5] for entry in entries
+                if entry.name.endswith(".json") and entry.name != "schema.json"
+            ]
+        
+        self._listing_cache = (mtime, names)
+        return list(names)
 
 
 # Create a singleton instance
@@ -174,4 +210,17 @@ def format_prompt(name: str, **kwargs) -> str:
         FileNotFoundError: If the prompt file doesn't exist
         KeyError: If required template variables are missing
     """
-    return _loader.format_prompt(name, **kwargs)
\ No newline at end of file
+    return _loader.format_prompt(name, **kwargs)
+
+
+def get_metadata(name: str) -> Dict[str, Any]:
+    """
+    Get metadata (name, version, variables, ...) for a prompt.
+    
+    Args:
+        name: Name of the prompt file (without .json extension)
+        
+    Returns:
+        Prompt metadata (everything except the template)
+    """
+    return _loader.get_metadata(name)
\ No newline at end of file
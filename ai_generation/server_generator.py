@@ -5,62 +5,272 @@ MCP Server Generator - Generates mock MCP servers with AI-powered responses.
 Creates a server.py and tools.py matching the structure of real MCP servers.
 """
 
+import functools
 import json
+import logging
+import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .ai_service import dumps_json, get_ai_service
+from .cache import cache_key, read_many, write_many
+from .evals_generator import (
+    _TEST_CASE_CACHE,
+    _fan_out_test_cases,
+    _merge_test_cases,
+    _test_case_cache_keys,
+    _validate_test_cases,
+    generate_ai_test_cases,
+)
+from .prompts import format_prompt, get_metadata
+from .tool_info import build_tools_info, group_identical_tools
+
+logger = logging.getLogger(__name__)
+
+# Per-item cache namespaces for incremental mock generation
+_TOOL_RESPONSE_CACHE = "mock_tool_responses"
+_RESOURCE_CONTENT_CACHE = "mock_resource_content"
+
+# Code templates for generated tools.py, built once at import
+TOOL_FN_TEMPLATE = (
+    '    @mcp.tool()\n'
+    '    def {name}({params}) -> str:\n'
+    '        """\n'
+    '        {desc}\n'
+    '        """\n'
+    '        # Log the request\n'
+    '        log_request("{name}"{log_args})\n'
+    '        \n'
+    '{validation}'
+    '        # Return mock response\n'
+    '        return {resp}\n\n'
+)
+VALIDATION_HEADER = '        # Validate required parameters\n'
+REQUIRED_CHECK_TEMPLATE = (
+    '        if {param} is None:\n'
+    '            return "Error: Missing required parameter: {param}"\n'
+)
+FALLBACK_RESP_TEMPLATE = '"Mock response for {name}"'
+RESOURCE_FN_TEMPLATE = (
+    '    @mcp.resource("{uri}")\n'
+    '    def {name}() -> str:\n'
+    '        """\n'
+    '        {desc}\n'
+    '        """\n'
+)
+RESOURCE_RESP_TEMPLATE = '        return {content}\n\n'
+
+# tools.py header, split around its two substitutions (server path, timestamp)
+TOOLS_HEADER_PREFIX = '"""\nAuto-generated MCP Tools\nGenerated from: '
+TOOLS_HEADER_MID = '\nGenerated at: '
+TOOLS_HEADER_SUFFIX = '''
+"""
 
-from .ai_service import AIService
-from .prompts import format_prompt
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastmcp import FastMCP
 
+# Request log for verification: (epoch seconds, tool name, params) per call,
+# formatted only when get_request_log is called. Only the most recent
+# MAX_LOG calls are kept so long-running mock servers don't grow without bound.
+MAX_LOG = int(os.getenv("MOCK_REQUEST_LOG_SIZE", "10000"))
+request_log = deque(maxlen=MAX_LOG)
 
-def generate_ai_mock_responses(tools: List[Dict[str, Any]]) -> Dict[str, str]:
+
+def log_request(tool_name: str, /, **params: Any):
+    """Log tool requests for verification."""
+    request_log.append((time.time(), tool_name, params))
+
+
+def register_tools(mcp: FastMCP):
+    """Register all tools with the MCP server."""
+    
+'''
+
+
+def serialize_tools_info(tools: List[Dict[str, Any]]) -> str:
     """
-    Generate mock responses for tools using Claude.
+    Serialize the tool fields Claude needs into compact JSON.
     
     Args:
         tools: List of tool definitions with name, description, and schema
         
     Returns:
-        Dictionary mapping tool names to mock response strings
+        JSON string for the prompt's tools_json variable
     """
-    print("🤖 Generating AI-powered mock responses...")
+    return dumps_json(build_tools_info(tools))
+
+
+def serialize_resources_info(resources: List[Dict[str, Any]]) -> str:
+    """
+    Serialize the resource fields Claude needs into compact JSON.
     
-    # Prepare tool information for Claude
-    tools_info = []
-    for tool in tools:
-        tool_info = {
-            "name": tool["name"],
-            "description": tool["description"],
-            "schema": tool.get("inputSchema", {})
+    Args:
+        resources: List of resource definitions with uri, name, description
+        
+    Returns:
+        JSON string for the prompt's resources_json variable
+    """
+    return dumps_json(_build_resources_info(resources))
+
+
+def _build_resources_info(resources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Condense resource definitions to the fields Claude needs."""
+    return [
+        {
+            "uri": resource["uri"],
+            "name": resource["name"],
+            "description": resource.get("description", ""),
+            "mimeType": resource.get("mimeType", "text/plain")
         }
-        tools_info.append(tool_info)
+        for resource in resources
+    ]
+
+
+def generate_ai_mock_payloads(tools_json: str, resources_json: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Generate mock tool responses and resource content with a single Claude call.
     
-    # Format the prompt
-    prompt = format_prompt(
-        "mock_responses",
-        tools_json=json.dumps(tools_info, indent=2)
-    )
+    Args:
+        tools_json: Tools serialized with serialize_tools_info
+        resources_json: Resources serialized with serialize_resources_info
+        
+    Returns:
+        tuple: (tool name -> mock response, resource name -> mock content)
+    """
+    print("🤖 Generating AI-powered mock responses...")
     
     try:
-        # Use AIService to generate response
-        service = AIService()
-        mock_responses = service.generate_json(prompt)
+        payload = _request_mock_payloads(tools_json, resources_json)
+        mock_responses = payload.get("tools") or {}
+        mock_content = payload.get("resources") or {}
         
         print(f"✅ Generated {len(mock_responses)} AI mock responses")
-        return mock_responses
+        if mock_content:
+            print(f"✅ Generated {len(mock_content)} AI mock resource content")
+        return mock_responses, mock_content
     
     except json.JSONDecodeError as e:
         print(f"⚠️  Failed to parse Claude response as JSON: {e}")
-        return {}
+        return {}, {}
     except Exception as e:
         print(f"⚠️  Error generating AI mock responses: {e}")
-        return {}
+        return {}, {}
+
+
+def _generate_mock_payloads_incrementally(
+    tools_info: List[Dict[str, Any]],
+    resources_info: List[Dict[str, Any]]
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Generate mock payloads, only asking Claude about tools and resources
+    whose definitions have no cached result yet.
+    
+    Each tool and resource is cached individually, keyed by its own
+    definition and the mock_all prompt version, so adding or editing one
+    tool reuses the cached responses of all the others.
+    
+    Returns:
+        tuple: (tool name -> mock response, resource name -> mock content)
+    """
+    tool_keys, resource_keys = _mock_cache_keys(tools_info, resources_info)
+    responses = read_many(_TOOL_RESPONSE_CACHE, tool_keys)
+    content = read_many(_RESOURCE_CONTENT_CACHE, resource_keys)
+    missing_tools = [info for info in tools_info if info["name"] not in responses]
+    missing_resources = [info for info in resources_info if info["name"] not in content]
+    
+    if responses or content:
+        print(f"♻️  Reusing cached mock data for {len(responses)} tools and {len(content)} resources")
+    if not missing_tools and not missing_resources:
+        return responses, content
+    
+    new_responses, new_content = generate_ai_mock_payloads(
+        dumps_json(missing_tools),
+        dumps_json(missing_resources)
+    )
+    write_many(_TOOL_RESPONSE_CACHE, tool_keys, new_responses)
+    write_many(_RESOURCE_CONTENT_CACHE, resource_keys, new_content)
+    
+    responses.update(new_responses)
+    content.update(new_content)
+    return responses, content
+
+
+def _mock_cache_keys(
+    tools_info: List[Dict[str, Any]],
+    resources_info: List[Dict[str, Any]]
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Per-item cache keys: each definition plus the mock_all prompt version."""
+    version = get_metadata("mock_all")["version"]
+    tool_keys = {info["name"]: cache_key(info, version) for info in tools_info}
+    resource_keys = {info["name"]: cache_key(info, version) for info in resources_info}
+    return tool_keys, resource_keys
+
+
+def _validate_json_object(payload: Any) -> None:
+    """
+    Check that Claude's response is a JSON object.
+    
+    Raises:
+        ValueError: If it is not
+    """
+    if not isinstance(payload, dict):
+        raise ValueError(f"Expected JSON object but got {type(payload).__name__}")
+
+
+def _validate_mock_and_tests(payload: Any) -> None:
+    """
+    Check the shape of a combined mock_and_tests response.
+    
+    Raises:
+        ValueError: If it is not an object with well-formed test cases
+    """
+    _validate_json_object(payload)
+    _validate_test_cases(payload.get("test_cases") or [])
+
+
+def _request_mock_payloads(tools_json: str, resources_json: str) -> Dict[str, Any]:
+    """
+    Ask Claude for mock tool responses and resource content.
+    
+    The formatted prompt embeds the inputs and the mock_all template, so
+    AIService's prompt-keyed cache lets an unchanged server skip the call.
+    
+    Raises:
+        ValueError: If Claude does not return a JSON object
+    """
+    prompt = format_prompt("mock_all", tools_json=tools_json, resources_json=resources_json)
+    
+    # Use AIService to generate response
+    return get_ai_service().generate_json(prompt, validate=_validate_json_object)
+
+
+def generate_ai_mock_responses(tools: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Generate mock responses for tools using Claude.
+    
+    Kept for backward compatibility; prefer generate_ai_mock_payloads.
+    
+    Args:
+        tools: List of tool definitions with name, description, and schema
+        
+    Returns:
+        Dictionary mapping tool names to mock response strings
+    """
+    mock_responses, _ = generate_ai_mock_payloads(serialize_tools_info(tools), "[]")
+    return mock_responses
 
 
 def generate_ai_mock_resource_content(resources: List[Dict[str, Any]]) -> Dict[str, str]:
     """
     Generate mock content for resources using Claude.
     
+    Kept for backward compatibility; prefer generate_ai_mock_payloads.
+    
     Args:
         resources: List of resource definitions with uri, name, description
         
@@ -69,61 +279,163 @@ def generate_ai_mock_resource_content(resources: List[Dict[str, Any]]) -> Dict[s
     """
     if not resources:
         return {}
-        
-    print("🤖 Generating AI-powered mock resource content...")
     
-    # Prepare resource information for Claude
-    resources_info = []
-    for resource in resources:
-        resource_info = {
-            "uri": resource["uri"],
-            "name": resource["name"],
-            "description": resource["description"],
-            "mimeType": resource.get("mimeType", "text/plain")
-        }
-        resources_info.append(resource_info)
+    _, mock_content = generate_ai_mock_payloads("[]", serialize_resources_info(resources))
+    return mock_content
+
+
+def generate_ai_all(
+    tools: List[Dict[str, Any]],
+    resources: List[Dict[str, Any]]
+) -> Tuple[Dict[str, str], Dict[str, str], List[Dict[str, Any]]]:
+    """
+    Generate mock responses, resource content, and test cases in one Claude call.
     
-    # Format the prompt (we'll create a resource-specific prompt)
-    prompt = format_prompt(
-        "mock_resource_content",
-        resources_json=json.dumps(resources_info, indent=2)
-    )
+    The tool definitions are sent once instead of once per generator. Results
+    are cached per tool and resource in the same caches the separate
+    generators use, so only tools and resources without a cached result are
+    sent to Claude. If the combined request fails or returns malformed test
+    cases, falls back to the separate mock and test case generators.
     
-    try:
-        # Use AIService to generate response
-        service = AIService()
-        mock_content = service.generate_json(prompt)
+    Args:
+        tools: List of tool definitions with name, description, and inputSchema
+        resources: List of resource definitions with uri, name, description
         
-        print(f"✅ Generated {len(mock_content)} AI mock resource content")
-        return mock_content
-    
-    except json.JSONDecodeError as e:
-        print(f"⚠️  Failed to parse Claude response as JSON: {e}")
-        return {}
-    except Exception as e:
-        print(f"⚠️  Error generating AI mock resource content: {e}")
-        return {}
+    Returns:
+        tuple: (tool name -> mock response, resource name -> mock content,
+                test case definitions for each tool)
+    """
+    print("🤖 Generating AI-powered mock responses and test cases...")
+    
+    tools_info = build_tools_info(tools)
+    unique_tools_info, duplicates = group_identical_tools(tools_info)
+    if len(unique_tools_info) < len(tools_info):
+        print(f"♻️  Collapsed {len(tools_info)} tools into {len(unique_tools_info)} unique schemas")
+    resources_info = _build_resources_info(resources)
+    
+    tool_keys, resource_keys = _mock_cache_keys(unique_tools_info, resources_info)
+    test_keys = _test_case_cache_keys(unique_tools_info)
+    responses = read_many(_TOOL_RESPONSE_CACHE, tool_keys)
+    content = read_many(_RESOURCE_CONTENT_CACHE, resource_keys)
+    cached_tests = read_many(_TEST_CASE_CACHE, test_keys)
+    
+    # A tool goes to Claude if either its mock response or its tests are missing
+    missing_tools = [
+        info for info in unique_tools_info
+        if info["name"] not in responses or info["name"] not in cached_tests
+    ]
+    missing_resources = [info for info in resources_info if info["name"] not in content]
+    if len(missing_tools) < len(unique_tools_info) or len(missing_resources) < len(resources_info):
+        print(f"♻️  Reusing cached results for {len(unique_tools_info) - len(missing_tools)} tools "
+              f"and {len(resources_info) - len(missing_resources)} resources")
+    
+    generated_tests = []
+    if missing_tools or missing_resources:
+        try:
+            prompt = format_prompt(
+                "mock_and_tests",
+                tools_json=dumps_json(missing_tools),
+                resources_json=dumps_json(missing_resources)
+            )
+            payload = get_ai_service().generate_json(prompt, validate=_validate_mock_and_tests)
+        except Exception as e:
+            print(f"⚠️  Combined generation failed: {e}")
+            print("🔄 Falling back to separate mock and test case generation...")
+            responses, content = _generate_mock_payloads_incrementally(unique_tools_info, resources_info)
+            return _fan_out_mock_responses(responses, duplicates), content, generate_ai_test_cases(tools)
+        
+        new_responses = payload.get("tools") or {}
+        new_content = payload.get("resources") or {}
+        generated_tests = payload.get("test_cases") or []
+        total_cases = sum(len(tool_tests.get("test_cases", [])) for tool_tests in generated_tests)
+        print(f"✅ Generated {len(new_responses)} AI mock responses, {len(new_content)} resource contents "
+              f"and {total_cases} test cases")
+        
+        write_many(_TOOL_RESPONSE_CACHE, tool_keys, new_responses)
+        write_many(_RESOURCE_CONTENT_CACHE, resource_keys, new_content)
+        write_many(_TEST_CASE_CACHE, test_keys, {
+            tool_tests["tool"]: tool_tests for tool_tests in generated_tests
+        })
+        responses.update(new_responses)
+        content.update(new_content)
+    
+    test_cases = _merge_test_cases(unique_tools_info, cached_tests, generated_tests)
+    return (
+        _fan_out_mock_responses(responses, duplicates),
+        content,
+        _fan_out_test_cases(test_cases, duplicates)
+    )
 
 
+_TYPE_MAP = {
+    "string": "str",
+    "number": "float",
+    "integer": "int",
+    "boolean": "bool",
+    "array": "list",
+    "object": "dict"
+}
+
+
+@functools.lru_cache(maxsize=None)
 def get_python_type(json_type: str, is_array: bool = False) -> str:
     """Convert JSON schema type to Python type annotation."""
-    type_map = {
-        "string": "str",
-        "number": "float",
-        "integer": "int",
-        "boolean": "bool",
-        "array": "list",
-        "object": "dict"
-    }
-    python_type = type_map.get(json_type, "Any")
-    if is_array:
-        return f"List[{python_type}]"
-    return python_type
+    python_type = _TYPE_MAP.get(json_type, "Any")
+    return f"List[{python_type}]" if is_array else python_type
 
 
-def generate_tools_py(discovery_data: Dict[str, Any], output_dir: Path) -> tuple[int, int]:
+def _param_python_type(param_schema: Dict[str, Any]) -> str:
+    """Resolve the Python annotation for one inputSchema property."""
+    param_type = param_schema.get("type", "string")
+    if param_type == "array":
+        return get_python_type(param_schema.get("items", {}).get("type", "Any"), True)
+    return get_python_type(param_type)
+
+
+@functools.lru_cache(maxsize=None)
+def _param_annotation(python_type: str, is_required: bool) -> str:
+    """Build the ': type' suffix of a parameter, Optional with a None default if not required."""
+    return f": {python_type}" if is_required else f": Optional[{python_type}] = None"
+
+
+def _fan_out_mock_responses(
+    responses: Dict[str, str],
+    duplicates: Dict[str, List[str]]
+) -> Dict[str, str]:
+    """
+    Copy each representative's mock response to the tools it stands in for.
+    
+    Args:
+        responses: Mock responses keyed by representative tool name
+        duplicates: Mapping of representative name to duplicate tool names
+        
+    Returns:
+        Mock responses keyed by every tool name Claude answered for
+    """
+    if not duplicates:
+        return responses
+    
+    expanded = dict(responses)
+    for representative, names in duplicates.items():
+        if representative in responses:
+            for name in names:
+                expanded[name] = responses[representative]
+    return expanded
+
+
+def generate_tools_py(
+    discovery_data: Dict[str, Any],
+    output_dir: Path,
+    mock_payloads: Optional[Tuple[Dict[str, str], Dict[str, str]]] = None
+) -> tuple[int, int]:
     """Generate tools.py with AI-powered mock implementations.
     
+    Args:
+        discovery_data: Server discovery information including tools and resources
+        output_dir: Directory to write tools.py to
+        mock_payloads: Precomputed (mock responses, resource content), e.g. from
+            generate_ai_all; when omitted they are generated here
+    
     Returns:
         tuple: (tools_count, generated_resources_count)
     """
@@ -132,44 +444,55 @@ def generate_tools_py(discovery_data: Dict[str, Any], output_dir: Path) -> tuple
     tools = discovery_data["tools"]
     resources = discovery_data.get("resources", [])
     
-    # Generate AI responses for tools
-    ai_responses = generate_ai_mock_responses(tools)
+    if mock_payloads is not None:
+        ai_responses, ai_resource_content = mock_payloads
+    else:
+        # Only ask Claude about one representative per group of identical tools
+        tools_info = build_tools_info(tools)
+        unique_tools_info, duplicates = group_identical_tools(tools_info)
+        if len(unique_tools_info) < len(tools_info):
+            print(f"♻️  Collapsed {len(tools_info)} tools into {len(unique_tools_info)} unique schemas")
+        
+        # Generate AI responses for tools and content for resources in one call,
+        # reusing cached per-item results from earlier runs
+        ai_responses, ai_resource_content = _generate_mock_payloads_incrementally(
+            unique_tools_info,
+            _build_resources_info(resources)
+        )
+        ai_responses = _fan_out_mock_responses(ai_responses, duplicates)
+    
+    # Stream tools.py straight to disk instead of building it in memory
+    tools_path = output_dir / "tools.py"
+    with open(tools_path, "w", buffering=1 << 20) as f:
+        generated_resources = _write_tools_code(
+            f.write, discovery_data, ai_responses, ai_resource_content
+        )
     
-    # Generate AI content for resources
-    ai_resource_content = generate_ai_mock_resource_content(resources)
+    print(f"✅ Generated tools.py with {len(tools)} tools" + (f" and {generated_resources} resources" if generated_resources > 0 else ""))
     
-    # Start building tools.py content
-    tools_code = '''"""
-Auto-generated MCP Tools
-Generated from: {server_path}
-Generated at: {timestamp}
-"""
-
-import json
-from datetime import datetime
-from typing import Any, Dict, List, Optional
-from fastmcp import FastMCP
-
-# Request log for verification
-request_log = []
-
-
-def log_request(tool_name: str, params: Dict[str, Any]):
-    """Log tool requests for verification."""
-    request_log.append({{
-        "timestamp": datetime.now().isoformat(),
-        "tool": tool_name,
-        "params": params
-    }})
+    return len(tools), generated_resources
 
 
-def register_tools(mcp: FastMCP):
-    """Register all tools with the MCP server."""
+def _write_tools_code(
+    write: Callable[[str], Any],
+    discovery_data: Dict[str, Any],
+    ai_responses: Dict[str, str],
+    ai_resource_content: Dict[str, str]
+) -> int:
+    """
+    Emit the tools.py source fragment by fragment through write.
     
-'''.format(
-        server_path=discovery_data["server_path"],
-        timestamp=discovery_data["metadata"]["discovered_at"]
-    )
+    Returns:
+        Number of resources that were generated
+    """
+    tools = discovery_data["tools"]
+    resources = discovery_data.get("resources", [])
+    
+    write(TOOLS_HEADER_PREFIX)
+    write(discovery_data["server_path"])
+    write(TOOLS_HEADER_MID)
+    write(discovery_data["metadata"]["discovered_at"])
+    write(TOOLS_HEADER_SUFFIX)
     
     # Generate each tool function
     for tool in tools:
@@ -181,109 +504,78 @@ def register_tools(mcp: FastMCP):
         properties = schema.get("properties", {})
         required = schema.get("required", [])
         
-        # Build parameter list
-        params = []
-        for param_name, param_schema in properties.items():
-            param_type = param_schema.get("type", "string")
-            
-            # Handle arrays
-            if param_type == "array":
-                items_type = param_schema.get("items", {}).get("type", "Any")
-                python_type = get_python_type(items_type, is_array=True)
-            else:
-                python_type = get_python_type(param_type)
-            
-            # Add optional annotation if not required
-            if param_name not in required:
-                python_type = f"Optional[{python_type}]"
-                params.append(f"{param_name}: {python_type} = None")
-            else:
-                params.append(f"{param_name}: {python_type}")
-        
-        # Generate tool function
-        params_str = ", ".join(params) if params else ""
-        
-        tools_code += f'''    @mcp.tool()
-    def {tool_name}({params_str}) -> str:
-        """
-        {description}
-        """
-        # Log the request
-        log_request("{tool_name}", locals())
+        # Build parameter list in one pass; optional params default to None
+        required_set = set(required)
+        params_str = ", ".join([
+            param_name + _param_annotation(_param_python_type(param_schema), param_name in required_set)
+            for param_name, param_schema in properties.items()
+        ])
         
-'''
-        
-        # Add validation for required parameters
+        # Validation for required parameters
         if required:
-            tools_code += "        # Validate required parameters\n"
-            for req_param in required:
-                tools_code += f"        if {req_param} is None:\n"
-                tools_code += f'            return "Error: Missing required parameter: {req_param}"\n'
-            tools_code += "\n"
+            validation = VALIDATION_HEADER + "".join([
+                REQUIRED_CHECK_TEMPLATE.format(param=req_param) for req_param in required
+            ]) + "\n"
+        else:
+            validation = ""
         
-        # Add AI-generated mock response
-        tools_code += "        # Return mock response\n"
+        # AI-generated mock response; repr() yields a correctly escaped literal
         if tool_name in ai_responses:
-            # Use triple quotes for multiline strings, escape triple quotes in content
-            ai_response = ai_responses[tool_name].replace('"""', '\\"\\"\\"')
-            tools_code += f'        return """{ai_response}"""\n\n'
+            resp = repr(ai_responses[tool_name])
         else:
             # Fallback if AI didn't generate a response for this tool
-            tools_code += f'        return "Mock response for {tool_name}"\n\n'
+            resp = FALLBACK_RESP_TEMPLATE.format(name=tool_name)
+        
+        # Log arguments by name rather than capturing locals() on every call
+        log_args = "".join([f", {param_name}={param_name}" for param_name in properties])
+        
+        # Emit the whole tool function in one write
+        write(TOOL_FN_TEMPLATE.format(
+            name=tool_name, params=params_str, log_args=log_args, desc=description,
+            validation=validation, resp=resp
+        ))
     
     # Add resource generation if any resources were discovered
     generated_resources = 0
     if resources:
-        tools_code += '''
+        write('''
 
 def register_resources(mcp: FastMCP):
     """Register all resources with the MCP server."""
     
-'''
+''')
         
         # Generate each resource function (static resources only)
         for resource in resources:
             resource_name = resource["name"]
-            description = resource["description"]
+            description = resource.get("description", "")
             uri = resource["uri"]
             
             # Generate static resource
-            tools_code += f'''    @mcp.resource("{uri}")
-    def {resource_name}() -> str:
-        """
-        {description}
-        """
-'''
+            write(RESOURCE_FN_TEMPLATE.format(uri=uri, name=resource_name, desc=description))
             
             # Add AI-generated mock content
-            tools_code += "        # Return mock content\n"
+            write("        # Return mock content\n")
             if resource_name in ai_resource_content:
-                # Properly escape the content string and handle multiline content
-                ai_content = ai_resource_content[resource_name]
-                # Escape backslashes, quotes, and newlines
-                ai_content = ai_content.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
-                tools_code += f'        return "{ai_content}"\n\n'
+                # repr() yields a correctly escaped Python literal in one pass
+                write(RESOURCE_RESP_TEMPLATE.format(content=repr(ai_resource_content[resource_name])))
                 generated_resources += 1
             else:
                 # Skip resource if no AI content was generated
-                print(f"   ⚠️  Skipping resource {resource_name} - no AI content generated")
+                logger.warning("Skipping resource %s - no AI content generated", resource_name)
                 continue
 
     # Add request log tool
-    tools_code += '''    @mcp.tool()
+    write('''    @mcp.tool()
     def get_request_log() -> str:
         """Get the log of all requests made to this mock server."""
-        return json.dumps(request_log, indent=2)
-'''
-    
-    # Write tools.py
-    tools_path = output_dir / "tools.py"
-    with open(tools_path, "w") as f:
-        f.write(tools_code)
+        return json.dumps([
+            {"timestamp": datetime.fromtimestamp(ts).isoformat(), "tool": tool, "params": params}
+            for ts, tool, params in request_log
+        ], indent=2)
+''')
     
-    print(f"✅ Generated tools.py with {len(tools)} tools" + (f" and {generated_resources} resources" if generated_resources > 0 else ""))
-    
-    return len(tools), generated_resources
+    return generated_resources
 
 
 def generate_server_py(discovery_data: Dict[str, Any], output_dir: Path, generated_resources_count: int = 0):
@@ -292,13 +584,14 @@ def generate_server_py(discovery_data: Dict[str, Any], output_dir: Path, generat
     
     has_resources = generated_resources_count > 0
     
-    imports = "from tools import register_tools"
+    register_names = ["register_tools"]
+    registration_parts = ["# Register all tools\nregister_tools(mcp)"]
     if has_resources:
-        imports += ", register_resources"
+        register_names.append("register_resources")
+        registration_parts.append("# Register all resources\nregister_resources(mcp)")
     
-    registration = "# Register all tools\nregister_tools(mcp)"
-    if has_resources:
-        registration += "\n\n# Register all resources\nregister_resources(mcp)"
+    imports = "from tools import " + ", ".join(register_names)
+    registration = "\n\n".join(registration_parts)
     
     server_code = f'''#!/usr/bin/env python3
 """
@@ -306,11 +599,10 @@ Auto-generated Mock MCP Server
 """
 
 import logging
-import sys
 
-# Suppress output to avoid MCP protocol issues
-logging.basicConfig(level=logging.CRITICAL, stream=sys.stderr)
-logging.getLogger().setLevel(logging.CRITICAL)
+# Suppress output to avoid MCP protocol issues; disabling logging outright
+# skips installing a handler and formatter that would never be used
+logging.disable(logging.CRITICAL)
 
 from fastmcp import FastMCP
 {imports}
@@ -333,18 +625,24 @@ if __name__ == "__main__":
     print("✅ Generated server.py")
 
 
-def generate_ai_mock_server(discovery_data: Dict[str, Any], output_dir: Path):
+def generate_ai_mock_server(
+    discovery_data: Dict[str, Any],
+    output_dir: Path,
+    mock_payloads: Optional[Tuple[Dict[str, str], Dict[str, str]]] = None
+):
     """
     Generate a complete mock MCP server with server.py and tools.py structure.
     
     Args:
         discovery_data: Server discovery information including tools and resources
         output_dir: Directory to write the generated files
+        mock_payloads: Precomputed (mock responses, resource content), e.g. from
+            generate_ai_all; when omitted they are generated here
     """
     print(f"📦 Generating mock server in: {output_dir}")
     
     # Generate tools.py with AI-powered responses and track generated resources
-    tools_count, generated_resources_count = generate_tools_py(discovery_data, output_dir)
+    tools_count, generated_resources_count = generate_tools_py(discovery_data, output_dir, mock_payloads)
     
     # Generate server.py
     generate_server_py(discovery_data, output_dir, generated_resources_count)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tool Info - Shared helpers for preparing discovered tools for Claude prompts.
+
+Both the mock server generator and the test case generator send Claude the
+same condensed view of each tool (name, description, input schema) and both
+collapse tools that are identical apart from their name.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from .cache import cache_key
+
+# Top-level schema keys that don't affect mock responses or test cases;
+# dropping them keeps the prompt smaller
+_UNUSED_SCHEMA_KEYS = frozenset({"$schema", "additionalProperties", "title"})
+
+
+def build_tools_info(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Condense tool definitions to the fields Claude needs.
+
+    Args:
+        tools: List of tool definitions with name, description, and inputSchema
+
+    Returns:
+        List of {"name", "description", "schema"} dicts
+    """
+    return [
+        {
+            "name": tool["name"],
+            "description": tool["description"],
+            "schema": _prompt_schema(tool.get("inputSchema", {}))
+        }
+        for tool in tools
+    ]
+
+
+def _prompt_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop top-level schema keys Claude doesn't need."""
+    if _UNUSED_SCHEMA_KEYS.isdisjoint(schema):
+        return schema
+    return {key: value for key, value in schema.items() if key not in _UNUSED_SCHEMA_KEYS}
+
+
+def schema_key(tool_info: Dict[str, Any]) -> str:
+    """Hash everything but the tool name so identical tools share a key."""
+    return cache_key({"description": tool_info["description"], "schema": tool_info["schema"]})
+
+
+def group_identical_tools(
+    tools_info: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], Dict[str, List[str]]]:
+    """
+    Group tools with identical descriptions and schemas.
+
+    The description is part of the key because generated output depends on
+    what a tool does, not just its parameters.
+
+    Returns:
+        tuple: (one representative tool_info per group,
+                mapping of representative name to the names of its duplicates)
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for tool_info in tools_info:
+        groups[schema_key(tool_info)].append(tool_info)
+
+    representatives = []
+    duplicates = {}
+    for group in groups.values():
+        representative = group[0]
+        representatives.append(representative)
+        if len(group) > 1:
+            duplicates[representative["name"]] = [t["name"] for t in group[1:]]
+
+    return representatives, duplicates
@@ -9,6 +9,7 @@ Modules:
 - auth: OAuth and token management
 - api: RESTful API endpoints
 - services: Business logic and external integrations
+- utils: Shared helpers (fast JSON)
 
 For detailed documentation, see backend/README.md
 """
\ No newline at end of file
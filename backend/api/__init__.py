@@ -15,6 +15,6 @@ Each module exports a setup function that returns a configured Flask Blueprint:
 Usage:
     from backend.api.chat import setup_chat_routes
     
-    chat_bp = setup_chat_routes(mcp_service, openai_service)
+    chat_bp = setup_chat_routes(mcp_service, openai_service, event_loop)
     app.register_blueprint(chat_bp)
 """
\ No newline at end of file
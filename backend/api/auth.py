@@ -3,18 +3,62 @@ Authentication API endpoints.
 """
 
 import base64
-import json
+import html
+import secrets
+from string import Template
 
 from flask import Blueprint, jsonify, request
 
 from backend.auth.oauth_handler import GoogleOAuthHandler
 from backend.auth.token_store import TokenStore
+from backend.services.mcp_service import MCPService
+from backend.utils import fastjson
+from backend.utils.event_loop import BackgroundEventLoop
 
 auth_bp = Blueprint('auth', __name__)
 
+# OAuth callback pages; substituted values must already be HTML-escaped
+_AUTH_SUCCESS_PAGE = Template("""
+            <html>
+            <body style="font-family: sans-serif; text-align: center; padding-top: 100px;">
+                <h1>✅ Authentication Successful!</h1>
+                <p>You can now use $name tools.</p>
+                <p>This window will close automatically...</p>
+                <script>
+                    setTimeout(function() {
+                        window.close();
+                    }, 2000);
+                </script>
+                <p><a href="http://localhost:3000">Return to chat</a></p>
+            </body>
+            </html>
+            """)
+
+_AUTH_FAILED_PAGE = Template("""
+            <html>
+            <body style="font-family: sans-serif; text-align: center; padding-top: 100px;">
+                <h1>❌ Authentication Failed</h1>
+                <p>Error: $error</p>
+                <p><a href="http://localhost:3000">Return to chat</a></p>
+            </body>
+            </html>
+            """)
+
 
-def setup_auth_routes(oauth_handler: GoogleOAuthHandler, token_store: TokenStore, servers_config: dict):
+def _encode_state(state_data: dict) -> str:
+    """Encode OAuth state as unpadded URL-safe base64 JSON."""
+    return base64.urlsafe_b64encode(fastjson.dumps_bytes(state_data)).rstrip(b"=").decode()
+
+
+def _decode_state(state: str) -> dict:
+    """Decode a state produced by _encode_state."""
+    return fastjson.loads(base64.urlsafe_b64decode(state + "=" * (-len(state) % 4)))
+
+
+def setup_auth_routes(oauth_handler: GoogleOAuthHandler, token_store: TokenStore, mcp_service: MCPService,
+                      event_loop: BackgroundEventLoop):
     """Setup auth routes with services."""
+    servers_config = mcp_service.servers
     
     @auth_bp.route('/api/oauth/start/<server_key>', methods=['GET'])
     def start_oauth(server_key):
@@ -24,23 +68,17 @@ def setup_auth_routes(oauth_handler: GoogleOAuthHandler, token_store: TokenStore
         
         server_config = servers_config[server_key]
         
-        if not server_config.get("requires_auth"):
+        if not server_config.requires_auth:
             return jsonify({"error": "Server doesn't require authentication"}), 400
         
-        if server_config.get("auth_type") == "google_oauth":
+        if server_config.auth_type == "google_oauth":
             try:
-                # Get authorization URL with server key in state
-                auth_url, state = oauth_handler.get_authorization_url()
-                
-                # Encode server key into the state parameter
-                state_data = {
+                # Carry the server key in the state parameter Google echoes back
+                encoded_state = _encode_state({
                     "server_key": server_key,
-                    "random_state": state
-                }
-                encoded_state = base64.b64encode(json.dumps(state_data).encode()).decode()
-                
-                # Replace state in URL
-                auth_url = auth_url.replace(f"state={state}", f"state={encoded_state}")
+                    "random_state": secrets.token_urlsafe(24)
+                })
+                auth_url, _ = oauth_handler.get_authorization_url(state=encoded_state)
                 
                 return jsonify({
                     "auth_url": auth_url,
@@ -59,26 +97,18 @@ def setup_auth_routes(oauth_handler: GoogleOAuthHandler, token_store: TokenStore
         error = request.args.get('error')
         
         if error:
-            return f"""
-            <html>
-            <body style="font-family: sans-serif; text-align: center; padding-top: 100px;">
-                <h1>❌ Authentication Failed</h1>
-                <p>Error: {error}</p>
-                <p><a href="http://localhost:3000">Return to chat</a></p>
-            </body>
-            </html>
-            """
+            return _AUTH_FAILED_PAGE.substitute(error=html.escape(error))
         
         if not code:
             return "No authorization code received", 400
         
         # Decode state parameter
         try:
-            state_data = json.loads(base64.b64decode(state.encode()).decode())
+            state_data = _decode_state(state)
             server_key = state_data.get('server_key')
             random_state = state_data.get('random_state')
         except Exception as e:
-            return f"Invalid state parameter format: {str(e)}", 400
+            return f"Invalid state parameter format: {html.escape(str(e))}", 400
         
         if not server_key:
             return "No server key in state", 400
@@ -89,34 +119,15 @@ def setup_auth_routes(oauth_handler: GoogleOAuthHandler, token_store: TokenStore
             
             # Save tokens
             token_store.save_tokens(server_key, tokens)
+            mcp_service.invalidate_tools_cache()
             
             # Return success page with auto-close
-            return f"""
-            <html>
-            <body style="font-family: sans-serif; text-align: center; padding-top: 100px;">
-                <h1>✅ Authentication Successful!</h1>
-                <p>You can now use {servers_config[server_key]['name']} tools.</p>
-                <p>This window will close automatically...</p>
-                <script>
-                    setTimeout(function() {{
-                        window.close();
-                    }}, 2000);
-                </script>
-                <p><a href="http://localhost:3000">Return to chat</a></p>
-            </body>
-            </html>
-            """
+            return _AUTH_SUCCESS_PAGE.substitute(
+                name=html.escape(servers_config[server_key].name)
+            )
         
         except Exception as e:
-            return f"""
-            <html>
-            <body style="font-family: sans-serif; text-align: center; padding-top: 100px;">
-                <h1>❌ Authentication Failed</h1>
-                <p>Error: {str(e)}</p>
-                <p><a href="http://localhost:3000">Return to chat</a></p>
-            </body>
-            </html>
-            """
+            return _AUTH_FAILED_PAGE.substitute(error=html.escape(str(e)))
 
     @auth_bp.route('/api/oauth/disconnect/<server_key>', methods=['POST'])
     def disconnect_oauth(server_key):
@@ -126,7 +137,9 @@ def setup_auth_routes(oauth_handler: GoogleOAuthHandler, token_store: TokenStore
         
         try:
             token_store.delete_tokens(server_key)
-            return jsonify({"message": f"Disconnected from {servers_config[server_key]['name']}"})
+            # Also stops the server process still holding the old tokens
+            event_loop.run(mcp_service.disconnect_server(server_key), timeout=10)
+            return jsonify({"message": f"Disconnected from {servers_config[server_key].name}"})
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
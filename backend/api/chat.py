@@ -3,22 +3,358 @@ Chat API endpoints.
 """
 
 import asyncio
-import json
+import concurrent.futures
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import closing
+from itertools import islice
+from typing import Dict, List, Tuple
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, session, stream_with_context
 
 from backend.services.mcp_service import MCPService
 from backend.services.openai_service import OpenAIService
+from backend.utils import fastjson
+from backend.utils.event_loop import BackgroundEventLoop
 
 chat_bp = Blueprint('chat', __name__)
 
-# Store conversation history
-conversation_history = []
+# Messages kept per session; older ones are dropped as new ones arrive
+MAX_HISTORY_MESSAGES = 200
 
+# Most recent messages sent to OpenAI with each request, capped by count and
+# by total text size (roughly 4 characters per token)
+CONTEXT_WINDOW_MESSAGES = 40
+CONTEXT_WINDOW_CHARS = 48_000
 
-def setup_chat_routes(mcp_service: MCPService, openai_service: OpenAIService):
+# Seconds a /api/chat turn may take before it is cancelled, so a stuck MCP
+# server or OpenAI call can't hold a request thread indefinitely
+CHAT_TURN_TIMEOUT = 240
+
+# Once a history outgrows the context window, all but about the last
+# SUMMARY_KEEP_MESSAGES messages are replaced by a summary written by the model
+SUMMARY_KEEP_MESSAGES = 20
+SUMMARY_PROMPT = (
+    "Summarize this conversation between a user and an assistant for the "
+    "assistant's own reference. Keep facts, user preferences, decisions and "
+    "tool results that later messages may rely on. Be concise."
+)
+_SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+# Sessions whose history is kept; the least recently active is dropped first,
+# and any session idle for SESSION_IDLE_TTL seconds is dropped
+MAX_SESSIONS = 1000
+SESSION_IDLE_TTL = 3600
+
+
+
+class _History(deque):
+    """
+    A session's messages.
+    
+    Request threads and the background event loop (which writes summaries)
+    both use a session's history, so anything that reads more than one
+    message or rewrites the start of the history holds its lock.
+    """
+    
+    def __init__(self, messages=()):
+        super().__init__(messages, maxlen=MAX_HISTORY_MESSAGES)
+        self.lock = threading.RLock()
+        self.compacting = False  # a summary is being written
+    
+    def append(self, message: dict):
+        with self.lock:
+            super().append(message)
+    
+    def extend(self, messages):
+        with self.lock:
+            super().extend(messages)
+    
+    def clear(self):
+        with self.lock:
+            super().clear()
+    
+    def snapshot(self) -> List[dict]:
+        """A copy of the messages."""
+        with self.lock:
+            return list(self)
+
+
+# Conversation history per browser session, keyed by the session's "sid" and
+# ordered from least to most recently used, with each session's last use
+_sessions: OrderedDict[str, _History] = OrderedDict()
+_last_used: Dict[str, float] = {}
+_sessions_lock = threading.Lock()
+
+
+def _session_history() -> _History:
+    """Return the history for the current session, assigning it an id if needed."""
+    sid = session.get('sid')
+    if sid is None:
+        sid = session['sid'] = uuid.uuid4().hex
+    
+    now = time.monotonic()
+    with _sessions_lock:
+        history = _sessions.get(sid)
+        if history is None:
+            history = _sessions[sid] = _History()
+        else:
+            _sessions.move_to_end(sid)
+        _last_used[sid] = now
+        
+        # Oldest first, so stop at the first session still in use
+        while len(_sessions) > 1:
+            oldest = next(iter(_sessions))
+            if len(_sessions) <= MAX_SESSIONS and now - _last_used[oldest] < SESSION_IDLE_TTL:
+                break
+            del _sessions[oldest], _last_used[oldest]
+    return history
+
+
+def _message_chars(message: dict) -> int:
+    """Approximate a message's size by the length of its text and tool arguments."""
+    size = len(message.get("content") or "")
+    for tool_call in message.get("tool_calls") or ():
+        size += len(tool_call["function"]["arguments"])
+    return size
+
+
+def _is_summary(message: dict) -> bool:
+    """Whether message is a summary written by _compact_history."""
+    return message["role"] == "system" and message["content"].startswith(_SUMMARY_PREFIX)
+
+
+def _context_window(history: _History) -> List[dict]:
+    """Return the messages to send to OpenAI: any summary, then the recent tail."""
+    with history.lock:
+        window = _recent_messages(history)
+        if history and _is_summary(history[0]) and (not window or window[0] is not history[0]):
+            window.insert(0, history[0])
+    return window
+
+
+def _recent_messages(history: _History) -> List[dict]:
+    """
+    Return the tail of history that fits the context window.
+    
+    Older messages are dropped once the window holds CONTEXT_WINDOW_MESSAGES
+    messages or CONTEXT_WINDOW_CHARS characters. The window starts at a user
+    message so it never opens with tool results whose assistant tool_calls
+    message has been cut off; if the current turn alone is over budget it is
+    sent whole.
+    """
+    start = len(history)
+    size = 0
+    while start > 0 and len(history) - start < CONTEXT_WINDOW_MESSAGES:
+        size += _message_chars(history[start - 1])
+        if size > CONTEXT_WINDOW_CHARS and start < len(history):
+            break
+        start -= 1
+    
+    window = list(islice(history, start, None))
+    for i, message in enumerate(window):
+        if message["role"] == "user":
+            return window[i:]
+    
+    # No user message fits: extend back to the start of the current turn
+    for i in range(start - 1, -1, -1):
+        if history[i]["role"] == "user":
+            return list(islice(history, i, None))
+    return window
+
+
+async def _run_tool_call(mcp_service: MCPService, name: str, raw_arguments: str) -> Tuple[dict, str]:
+    """
+    Parse one tool call's arguments and run it.
+    
+    Failures, including malformed arguments from the model, become an
+    "Error: ..." result so they don't abort the other calls in the turn.
+    
+    Returns:
+        tuple: (parsed arguments, result text)
+    """
+    try:
+        args = fastjson.loads(raw_arguments or "{}")
+    except ValueError as e:
+        return {}, f"Error: invalid tool arguments: {e}"
+    try:
+        return args, await mcp_service.call_tool(name, args, raw_arguments=raw_arguments)
+    except Exception as e:
+        return args, f"Error: {e}"
+
+
+# Keep caches and reverse proxies (e.g. nginx) from holding back streamed tokens
+_SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def _render_transcript(messages: List[dict]) -> str:
+    """Render messages as plain text for the summarization prompt."""
+    lines = []
+    for message in messages:
+        if _is_summary(message):
+            lines.append(message["content"])
+            continue
+        for tool_call in message.get("tool_calls") or ():
+            function = tool_call["function"]
+            lines.append(f"assistant called {function['name']}({function['arguments']})")
+        if message.get("content"):
+            role = "tool result" if message["role"] == "tool" else message["role"]
+            lines.append(f"{role}: {message['content']}")
+    return "\n".join(lines)
+
+
+async def _compact_history(openai_service: OpenAIService, history: _History):
+    """
+    Replace all but the most recent messages of a long history with a summary.
+    
+    Runs in the background after a turn. The kept tail starts at a user
+    message, and a previous summary is folded into the new one. If the
+    summary can't be written, or history was cleared meanwhile, history is
+    left as it is. The history's lock is held while its prefix is read and
+    while it is replaced, not while the summary is written.
+    """
+    with history.lock:
+        if len(history) <= CONTEXT_WINDOW_MESSAGES or history.compacting:
+            return
+        cut = next(
+            (i for i in range(len(history) - SUMMARY_KEEP_MESSAGES, len(history))
+             if history[i]["role"] == "user"),
+            None
+        )
+        if cut is None:
+            return
+        
+        older = list(islice(history, cut))
+        history.compacting = True
+    try:
+        response = await openai_service.async_chat_completion(messages=[
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": _render_transcript(older)},
+        ])
+        summary = response.choices[0].message.content
+        
+        # New messages only ever go on the right, so the prefix is unchanged
+        # unless the history was cleared while the summary was written
+        with history.lock:
+            if len(history) >= cut and history[0] is older[0] and history[cut - 1] is older[-1]:
+                for _ in range(cut):
+                    history.popleft()
+                history.appendleft({"role": "system", "content": _SUMMARY_PREFIX + summary})
+    except Exception as e:
+        print(f"⚠️  Could not summarize chat history: {e}")
+    finally:
+        history.compacting = False
+
+
+def _sse(payload: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"data: {fastjson.dumps(payload)}\n\n"
+
+
+def setup_chat_routes(mcp_service: MCPService, openai_service: OpenAIService,
+                      event_loop: BackgroundEventLoop):
     """Setup chat routes with services."""
     
+    def compact_in_background(history: _History):
+        """Summarize older messages once history outgrows the context window."""
+        if len(history) > CONTEXT_WINDOW_MESSAGES:
+            event_loop.submit(_compact_history(openai_service, history))
+    
+    async def chat_turn(history: _History, cache_key: str) -> dict:
+        """
+        Answer the latest user message in history, running any tool calls.
+        
+        The whole turn runs as one coroutine on the background loop, so the
+        OpenAI requests and MCP calls share it without a sync/async hop
+        between each step. cache_key (the session id) lets OpenAI reuse its
+        prompt cache for the conversation's unchanged prefix.
+        """
+        openai_tools = await mcp_service.get_tools()
+        
+        # Call OpenAI with tools
+        response = await openai_service.async_chat_completion(
+            messages=_context_window(history),
+            tools=openai_tools,
+            cache_key=cache_key
+        )
+        
+        assistant_message = response.choices[0].message
+        
+        if not assistant_message.tool_calls:
+            # No tool call, just return the response
+            history.append({
+                "role": "assistant",
+                "content": assistant_message.content
+            })
+            return {"response": assistant_message.content}
+        
+        # Run all tool calls concurrently; results come back in call order
+        outcomes = await asyncio.gather(*(
+            _run_tool_call(mcp_service, tool_call.function.name, tool_call.function.arguments)
+            for tool_call in assistant_message.tool_calls
+        ))
+        
+        tool_calls_made = []
+        tool_messages = []
+        for tool_call, (function_args, result) in zip(assistant_message.tool_calls, outcomes):
+            # Store tool call details
+            tool_calls_made.append({
+                "name": tool_call.function.name,
+                "args": function_args,
+                "result": result,
+                "id": tool_call.id
+            })
+            tool_messages.append({
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": result,
+            })
+        
+        # Add the assistant's tool calls and their results in one step, after
+        # the tools finish: a turn cancelled mid-gather (e.g. on timeout)
+        # must not leave tool_calls without results, which OpenAI rejects
+        history.extend([{
+            "role": "assistant",
+            "content": assistant_message.content,
+            "tool_calls": [
+                {
+                    "id": tc.id,
+                    "type": "function",
+                    "function": {
+                        "name": tc.function.name,
+                        "arguments": tc.function.arguments
+                    }
+                }
+                for tc in assistant_message.tool_calls
+            ]
+        }, *tool_messages])
+        
+        # Get final response from OpenAI. The same tools are sent (but not
+        # offered) so the request shares its prefix with the first one and
+        # OpenAI's prompt cache covers the tools, system prompt and history.
+        final_response = await openai_service.async_chat_completion(
+            messages=_context_window(history),
+            tools=openai_tools,
+            cache_key=cache_key,
+            tool_choice="none"
+        )
+        
+        final_message = final_response.choices[0].message.content
+        history.append({
+            "role": "assistant",
+            "content": final_message
+        })
+        
+        return {
+            "response": final_message,
+            "tool_calls": tool_calls_made  # Send all tool calls
+        }
+    
     @chat_bp.route('/api/chat', methods=['POST'])
     def chat():
         """Handle chat messages from the frontend."""
@@ -30,117 +366,181 @@ def setup_chat_routes(mcp_service: MCPService, openai_service: OpenAIService):
                 return jsonify({"error": "No message provided"}), 400
             
             # Add user message to history
-            conversation_history.append({
+            history = _session_history()
+            history.append({
                 "role": "user",
                 "content": user_message
             })
             
-            # Get MCP tools in a new event loop
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            openai_tools = loop.run_until_complete(mcp_service.get_tools())
+            result = event_loop.run(chat_turn(history, session['sid']), timeout=CHAT_TURN_TIMEOUT)
+            compact_in_background(history)
+            return jsonify(result)
+        
+        except TimeoutError:
+            return jsonify({"error": "Timed out waiting for a response"}), 504
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @chat_bp.route('/api/chat/stream', methods=['POST'])
+    def chat_stream():
+        """
+        Handle a chat message, streaming the reply as Server-Sent Events.
+        
+        Events are JSON objects: {"delta": text} for response tokens,
+        {"tool_call": {...}} once a tool has run, {"error": message} on
+        failure, and {"done": true} at the end. Each tool call is started on
+        the MCP event loop as soon as its arguments have finished streaming.
+        """
+        data = request.json
+        user_message = data.get('message', '')
+        
+        if not user_message:
+            return jsonify({"error": "No message provided"}), 400
+        
+        history = _session_history()
+        history.append({
+            "role": "user",
+            "content": user_message
+        })
+        cache_key = session['sid']
+        
+        def stream_completion(stream, on_tool_call_complete=None):
+            """
+            Yield SSE deltas from an OpenAI stream; return (content, tool_calls).
             
-            # Call OpenAI with tools
-            response = openai_service.chat_completion(
-                messages=conversation_history,
-                tools=openai_tools
-            )
+            The stream is closed when this generator is, e.g. because the
+            client disconnected, so its connection goes back to the pool
+            instead of reading the rest of an unwanted reply.
+            """
+            content_parts = []
+            tool_calls = []
+            with closing(stream):
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        content_parts.append(delta.content)
+                        yield _sse({"delta": delta.content})
+                    for tc_delta in delta.tool_calls or []:
+                        if tc_delta.index >= len(tool_calls):
+                            # A new tool call starting means the previous one is complete
+                            if tool_calls and on_tool_call_complete:
+                                on_tool_call_complete(tool_calls[-1])
+                            tool_calls.append({"id": tc_delta.id, "name": "", "arguments": ""})
+                        current = tool_calls[tc_delta.index]
+                        function = tc_delta.function
+                        if function is None:  # e.g. a delta carrying only the id
+                            continue
+                        if function.name:
+                            current["name"] += function.name
+                        if function.arguments:
+                            current["arguments"] += function.arguments
+            if tool_calls and on_tool_call_complete:
+                on_tool_call_complete(tool_calls[-1])
+            return "".join(content_parts), tool_calls
+        
+        def generate():
+            futures = []
             
-            assistant_message = response.choices[0].message
+            def start_tool_call(tool_call: dict):
+                """Kick off an MCP call for a fully streamed tool call."""
+                tool_call["future"] = event_loop.submit(
+                    _run_tool_call(mcp_service, tool_call["name"], tool_call["arguments"])
+                )
+                futures.append(tool_call["future"])
             
-            # Handle tool calls
-            if assistant_message.tool_calls:
-                # Add assistant's tool call to history
-                conversation_history.append({
-                    "role": "assistant",
-                    "content": assistant_message.content,
-                    "tool_calls": [
-                        {
-                            "id": tc.id,
-                            "type": "function",
-                            "function": {
-                                "name": tc.function.name,
-                                "arguments": tc.function.arguments
-                            }
-                        }
-                        for tc in assistant_message.tool_calls
-                    ]
-                })
+            try:
+                content, tool_calls = yield from stream_completion(
+                    openai_service.stream_chat_completion(
+                        _context_window(history), openai_tools, cache_key=cache_key
+                    ),
+                    start_tool_call
+                )
                 
-                # Execute each tool call and collect results
-                tool_calls_made = []
-                for tool_call in assistant_message.tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    
-                    # Find which server owns this tool
-                    server_key = None
-                    for tool in openai_tools:
-                        if tool['function']['name'] == function_name:
-                            server_key = tool.get('_server')
-                            break
+                if tool_calls:
+                    # Collect results in call order; calls already run
+                    # concurrently, so the time limit covers them together
+                    deadline = time.monotonic() + CHAT_TURN_TIMEOUT
+                    outcomes = [
+                        tc["future"].result(max(0.0, deadline - time.monotonic()))
+                        for tc in tool_calls
+                    ]
                     
-                    # Call MCP tool
-                    result = loop.run_until_complete(
-                        mcp_service.call_tool(function_name, function_args, server_key)
-                    )
+                    # Record the whole tool round before yielding anything: the
+                    # client may disconnect at any yield, and history must never
+                    # hold tool_calls without all of their results
+                    history.extend([{
+                        "role": "assistant",
+                        "content": content or None,
+                        "tool_calls": [
+                            {
+                                "id": tc["id"],
+                                "type": "function",
+                                "function": {"name": tc["name"], "arguments": tc["arguments"]}
+                            }
+                            for tc in tool_calls
+                        ]
+                    }, *(
+                        {"role": "tool", "tool_call_id": tc["id"], "content": result}
+                        for tc, (_, result) in zip(tool_calls, outcomes)
+                    )])
                     
-                    # Store tool call details
-                    tool_calls_made.append({
-                        "name": function_name,
-                        "args": function_args,
-                        "result": result,
-                        "id": tool_call.id
-                    })
+                    for tc, (args, result) in zip(tool_calls, outcomes):
+                        yield _sse({"tool_call": {
+                            "name": tc["name"],
+                            "args": args,
+                            "result": result,
+                            "id": tc["id"]
+                        }})
                     
-                    # Add tool result to history
-                    conversation_history.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": result,
-                    })
-                
-                # Get final response from OpenAI
-                final_response = openai_service.chat_completion_with_tools(
-                    messages=conversation_history
-                )
-                
-                final_message = final_response.choices[0].message.content
-                conversation_history.append({
-                    "role": "assistant",
-                    "content": final_message
-                })
+                    # Same tools, not offered, so the prompt cache prefix matches
+                    content, _ = yield from stream_completion(
+                        openai_service.stream_chat_completion(
+                            _context_window(history), openai_tools,
+                            cache_key=cache_key, tool_choice="none"
+                        )
+                    )
                 
-                loop.close()
-                return jsonify({
-                    "response": final_message,
-                    "tool_calls": tool_calls_made  # Send all tool calls
-                })
-            else:
-                # No tool call, just return the response
-                conversation_history.append({
+                history.append({
                     "role": "assistant",
-                    "content": assistant_message.content
-                })
-                
-                loop.close()
-                return jsonify({
-                    "response": assistant_message.content
+                    "content": content
                 })
+                compact_in_background(history)
+                yield _sse({"done": True})
+            
+            except concurrent.futures.TimeoutError:
+                yield _sse({"error": "Timed out waiting for a response"})
+            except Exception as e:
+                yield _sse({"error": str(e)})
+            finally:
+                # Stop tool calls still running after a timeout, an error or
+                # the client disconnecting (GeneratorExit)
+                for future in futures:
+                    future.cancel()
         
+        try:
+            openai_tools = event_loop.run(mcp_service.get_tools(), timeout=CHAT_TURN_TIMEOUT)
+        except TimeoutError:
+            return jsonify({"error": "Timed out waiting for a response"}), 504
         except Exception as e:
             return jsonify({"error": str(e)}), 500
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers=_SSE_HEADERS
+        )
 
     @chat_bp.route('/api/history', methods=['GET'])
     def get_history():
-        """Get conversation history."""
-        return jsonify({"history": conversation_history})
+        """Get conversation history for the current session."""
+        return jsonify({"history": _session_history().snapshot()})
 
     @chat_bp.route('/api/clear', methods=['POST'])
     def clear_history():
-        """Clear conversation history."""
-        global conversation_history
-        conversation_history = []
+        """Clear conversation history for the current session."""
+        _session_history().clear()
         return jsonify({"message": "History cleared"})
     
     return chat_bp
\ No newline at end of file
@@ -2,27 +2,46 @@
 Tools API endpoints.
 """
 
-import asyncio
-
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify
 
 from backend.services.mcp_service import MCPService
+from backend.utils import fastjson
+from backend.utils.event_loop import BackgroundEventLoop
 
 tools_bp = Blueprint('tools', __name__)
 
 
-def setup_tools_routes(mcp_service: MCPService):
+def setup_tools_routes(mcp_service: MCPService, event_loop: BackgroundEventLoop):
     """Setup tools routes with services."""
     
+    # (tool list, encoded response body) last served. get_tools() returns the
+    # same cached list object until it re-lists the servers, so an unchanged
+    # listing is sent without serializing it again.
+    served = None
+    
+    def tools_response(openai_tools: list) -> Response:
+        """JSON response for a tool listing, reusing the last encoding if it's the same list."""
+        nonlocal served
+        if served is None or served[0] is not openai_tools:
+            served = (openai_tools, fastjson.dumps_bytes({"tools": openai_tools}))
+        return Response(served[1], mimetype="application/json")
+    
     @tools_bp.route('/api/tools', methods=['GET'])
     def get_tools():
         """Get available MCP tools."""
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            openai_tools = loop.run_until_complete(mcp_service.get_tools())
-            loop.close()
-            return jsonify({"tools": openai_tools})
+            openai_tools = event_loop.run(mcp_service.get_tools())
+            return tools_response(openai_tools)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+    
+    @tools_bp.route('/api/tools/refresh', methods=['POST'])
+    def refresh_tools():
+        """Drop the cached tool listing and list tools from the servers again."""
+        try:
+            mcp_service.invalidate_tools_cache()
+            openai_tools = event_loop.run(mcp_service.get_tools())
+            return tools_response(openai_tools)
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
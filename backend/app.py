@@ -2,31 +2,58 @@
 Main Flask application for the MCP chat backend.
 """
 
+import atexit
 import os
 
 from dotenv import load_dotenv
 from flask import Flask
 from flask_cors import CORS
 
-from backend.api.auth import setup_auth_routes
-from backend.api.chat import setup_chat_routes
-from backend.api.servers import setup_servers_routes
-from backend.api.tools import setup_tools_routes
-from backend.auth.oauth_handler import GoogleOAuthHandler
-from backend.auth.token_store import TokenStore
-from backend.services.mcp_service import MCPService
-from backend.services.openai_service import OpenAIService
+from backend.utils.fastjson import FastJSONProvider
+
+try:
+    from flask_compress import Compress
+except ImportError:  # flask-compress is optional (installed with the server extra)
+    Compress = None
 
 # Load environment variables
 load_dotenv()
 
+# Production server settings. One worker process keeps the per-session chat
+# history, tool cache and MCP event loop shared; threads serve requests in
+# parallel so a slow chat request doesn't block the other endpoints.
+# Listen on localhost only unless BACKEND_HOST opts into a wider bind (e.g.
+# 0.0.0.0): the API runs tools and holds OAuth tokens for whoever can reach it
+SERVER_HOST = os.getenv("BACKEND_HOST", "127.0.0.1")
+SERVER_PORT = 5001
+SERVER_THREADS = 8
+SERVER_TIMEOUT = 300  # seconds; chat requests wait on OpenAI and MCP tools
+
 
 def create_app():
     """Create and configure the Flask app."""
+    # Routes and services pull in the MCP, OpenAI and Google SDKs; import them
+    # here so importing this module stays cheap
+    from backend.api.auth import setup_auth_routes
+    from backend.api.chat import setup_chat_routes
+    from backend.api.servers import setup_servers_routes
+    from backend.api.tools import setup_tools_routes
+    from backend.auth.oauth_handler import GoogleOAuthHandler
+    from backend.auth.token_store import TokenStore
+    from backend.services.mcp_service import MCPService
+    from backend.services.openai_service import OpenAIService
+    from backend.utils.event_loop import BackgroundEventLoop
+    
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret-key-change-in-production")
     CORS(app, supports_credentials=True)  # Enable CORS with credentials
     
+    # Gzip/brotli JSON responses; streamed chat events must reach the client unbuffered
+    if Compress is not None:
+        app.config["COMPRESS_STREAMS"] = False
+        Compress(app)
+    
     # Initialize services
     token_store = TokenStore()
     oauth_handler = GoogleOAuthHandler(
@@ -37,11 +64,27 @@ def create_app():
     mcp_service = MCPService(token_store, oauth_handler)
     openai_service = OpenAIService(api_key=os.getenv("OPENAI_API_KEY"))
     
+    # One long-lived event loop for all MCP calls made from request handlers
+    event_loop = BackgroundEventLoop()
+    
+    # Connect to MCP servers and list their tools in the background so the
+    # first chat doesn't wait for server start-up; this also refreshes any
+    # stored access token that is expired or about to expire
+    event_loop.submit(mcp_service.get_tools())
+    
+    # Pooled MCP sessions keep server processes running; stop them on exit,
+    # along with the OpenAI clients' keep-alive connections
+    @atexit.register
+    def _shutdown():
+        event_loop.run(mcp_service.aclose(), timeout=10)
+        event_loop.run(openai_service.aclose(), timeout=10)
+        event_loop.close(timeout=10)
+    
     # Setup route blueprints
-    chat_bp = setup_chat_routes(mcp_service, openai_service)
-    tools_bp = setup_tools_routes(mcp_service)
+    chat_bp = setup_chat_routes(mcp_service, openai_service, event_loop)
+    tools_bp = setup_tools_routes(mcp_service, event_loop)
     servers_bp = setup_servers_routes(mcp_service)
-    auth_bp = setup_auth_routes(oauth_handler, token_store, mcp_service.servers)
+    auth_bp = setup_auth_routes(oauth_handler, token_store, mcp_service, event_loop)
     
     # Register blueprints
     app.register_blueprint(chat_bp)
@@ -54,11 +97,13 @@ def create_app():
 
 def run_app():
     """Run the Flask application."""
-    app = create_app()
+    from backend.auth.oauth_handler import GoogleOAuthHandler
+    from backend.auth.token_store import TokenStore
+    from backend.services.mcp_service import MCPService
     
     print("🚀 Starting chat backend...")
     print("📡 Connecting to MCP servers...")
-    print("🌐 Backend running on http://localhost:5001")
+    print(f"🌐 Backend running on http://{SERVER_HOST}:{SERVER_PORT}")
     print("\n📋 Available servers:")
     
     # Create a temporary MCP service to get server info
@@ -69,11 +114,43 @@ def run_app():
     )
     mcp_service = MCPService(token_store, oauth_handler)
     
-    for key, config in mcp_service.servers.items():
-        auth_status = "🔐 Requires auth" if config.get("requires_auth") else "✅ No auth needed"
-        print(f"  - {config['name']}: {auth_status}")
+    for config in mcp_service.servers.values():
+        auth_status = "🔐 Requires auth" if config.requires_auth else "✅ No auth needed"
+        print(f"  - {config.name}: {auth_status}")
+    
+    if os.getenv("FLASK_DEBUG") == "1":
+        create_app().run(debug=True, host=SERVER_HOST, port=SERVER_PORT)
+    else:
+        _serve()
+
+
+def _serve():
+    """
+    Serve the app with gunicorn, falling back to the threaded dev server.
+    
+    The app is created in the process that serves it: its MCP sessions and
+    event loop thread (started by the warm-up in create_app) don't survive
+    gunicorn forking the worker.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("⚠️  gunicorn not installed, using the Flask development server")
+        create_app().run(host=SERVER_HOST, port=SERVER_PORT, threaded=True)
+        return
+    
+    class _GunicornApp(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{SERVER_HOST}:{SERVER_PORT}")
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("workers", 1)
+            self.cfg.set("threads", SERVER_THREADS)
+            self.cfg.set("timeout", SERVER_TIMEOUT)
+        
+        def load(self):
+            return create_app()
     
-    app.run(debug=True, port=5001)
+    _GunicornApp().run()
 
 
 if __name__ == '__main__':
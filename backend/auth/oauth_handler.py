@@ -6,9 +6,7 @@ Handles Google Drive and Gmail authentication with persistent token storage.
 import json
 from typing import Optional
 
-from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
 
 
 class GoogleOAuthHandler:
@@ -32,6 +30,17 @@ class GoogleOAuthHandler:
         self.redirect_uri = redirect_uri
         self.flow = None
     
+    def _new_flow(self, state: Optional[str] = None):
+        """Create an OAuth flow; oauthlib is imported only when a flow is needed"""
+        from google_auth_oauthlib.flow import Flow
+        
+        return Flow.from_client_config(
+            self.get_client_config(),
+            scopes=self.SCOPES,
+            redirect_uri=self.redirect_uri,
+            state=state
+        )
+    
     def get_client_config(self) -> dict:
         """Generate client config for google-auth"""
         return {
@@ -44,21 +53,19 @@ class GoogleOAuthHandler:
             }
         }
     
-    def get_authorization_url(self) -> tuple[str, str]:
+    def get_authorization_url(self, state: Optional[str] = None) -> tuple[str, str]:
         """
         Get the authorization URL for user to authenticate.
+        Uses the given state parameter, or a random one if omitted.
         Returns: (authorization_url, state)
         """
-        self.flow = Flow.from_client_config(
-            self.get_client_config(),
-            scopes=self.SCOPES,
-            redirect_uri=self.redirect_uri
-        )
+        self.flow = self._new_flow()
         
         authorization_url, state = self.flow.authorization_url(
             access_type='offline',  # Get refresh token
             prompt='consent',  # Force consent to ensure refresh token
-            include_granted_scopes='true'
+            include_granted_scopes='true',
+            state=state
         )
         
         return authorization_url, state
@@ -70,12 +77,7 @@ class GoogleOAuthHandler:
         """
         if not self.flow:
             # Recreate flow if not exists
-            self.flow = Flow.from_client_config(
-                self.get_client_config(),
-                scopes=self.SCOPES,
-                redirect_uri=self.redirect_uri,
-                state=state
-            )
+            self.flow = self._new_flow(state)
         
         # Fetch token
         self.flow.fetch_token(code=code)
@@ -95,8 +97,16 @@ class GoogleOAuthHandler:
     def refresh_access_token(self, refresh_token: str) -> dict:
         """
         Refresh an expired access token using refresh token.
+        The request carries only the refresh token and client credentials,
+        never the stale access token.
         Returns: dict with new access_token
+        Raises: ValueError if refresh_token is empty
         """
+        if not refresh_token:
+            raise ValueError("No refresh token; re-authentication required")
+        
+        from google.auth.transport.requests import Request
+        
         creds = Credentials(
             token=None,
             refresh_token=refresh_token,
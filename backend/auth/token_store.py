@@ -3,13 +3,24 @@ Persistent token storage for OAuth tokens using SQLite.
 Stores tokens securely with encryption support.
 """
 
-import json
 import os
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Optional
 
+_UPSERT_TOKENS_SQL = """
+    INSERT OR REPLACE INTO tokens 
+    (server_name, access_token, refresh_token, token_type, 
+     expires_at, scopes, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SELECT_TOKENS_SQL = "SELECT * FROM tokens WHERE server_name = ?"
+
+_DELETE_TOKENS_SQL = "DELETE FROM tokens WHERE server_name = ?"
+
 
 class TokenStore:
     """Persistent token storage for OAuth tokens"""
@@ -21,103 +32,118 @@ class TokenStore:
         
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # One connection shared by all request threads; the lock serializes access
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        
+        # Decoded rows by server name (None when none are stored), filled on
+        # first read and written through by save_tokens/delete_tokens, so
+        # lookups on the request path don't touch the database. Assumes this
+        # store is the only writer, as with the single-process server.
+        self._cache: Dict[str, Optional[Dict]] = {}
         self._init_db()
     
     def _init_db(self):
         """Create tokens table if it doesn't exist"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS tokens (
-                server_name TEXT PRIMARY KEY,
-                access_token TEXT NOT NULL,
-                refresh_token TEXT,
-                token_type TEXT DEFAULT 'Bearer',
-                expires_at INTEGER NOT NULL,
-                scopes TEXT,
-                created_at INTEGER NOT NULL,
-                updated_at INTEGER NOT NULL
-            )
-        """)
-        conn.commit()
-        conn.close()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS tokens (
+                    server_name TEXT PRIMARY KEY,
+                    access_token TEXT NOT NULL,
+                    refresh_token TEXT,
+                    token_type TEXT DEFAULT 'Bearer',
+                    expires_at INTEGER NOT NULL,
+                    scopes TEXT,
+                    created_at INTEGER NOT NULL,
+                    updated_at INTEGER NOT NULL
+                )
+            """)
     
     def save_tokens(self, server_name: str, tokens: Dict):
         """Save tokens for a server"""
-        conn = sqlite3.connect(self.db_path)
-        
         # Calculate expiration time
-        expires_in = tokens.get('expires_in', 3600)
-        expires_at = int((datetime.now() + timedelta(seconds=expires_in)).timestamp())
-        now = int(datetime.now().timestamp())
+        now = int(time.time())
+        expires_at = now + int(tokens.get('expires_in', 3600))
         
         # Get scopes
         scopes = tokens.get('scope', '')
         if isinstance(scopes, list):
             scopes = ' '.join(scopes)
         
-        conn.execute("""
-            INSERT OR REPLACE INTO tokens 
-            (server_name, access_token, refresh_token, token_type, 
-             expires_at, scopes, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            server_name,
-            tokens['access_token'],
-            tokens.get('refresh_token'),
-            tokens.get('token_type', 'Bearer'),
-            expires_at,
-            scopes,
-            now,
-            now
-        ))
+        row = {
+            'access_token': tokens['access_token'],
+            'refresh_token': tokens.get('refresh_token'),
+            'token_type': tokens.get('token_type', 'Bearer'),
+            'expires_at': expires_at,
+            'scopes': scopes.split() if scopes else []
+        }
+        
+        with self._lock, self._conn:
+            self._conn.execute(_UPSERT_TOKENS_SQL, (
+                server_name,
+                row['access_token'],
+                row['refresh_token'],
+                row['token_type'],
+                expires_at,
+                scopes,
+                now,
+                now
+            ))
+            self._cache[server_name] = row
         
-        conn.commit()
-        conn.close()
         print(f"✅ Tokens saved for {server_name}")
     
     def get_tokens(self, server_name: str) -> Optional[Dict]:
         """Retrieve tokens for a server"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        
-        cursor = conn.execute(
-            "SELECT * FROM tokens WHERE server_name = ?",
-            (server_name,)
-        )
-        row = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            if server_name in self._cache:
+                tokens = self._cache[server_name]
+            else:
+                row = self._conn.execute(_SELECT_TOKENS_SQL, (server_name,)).fetchone()
+                tokens = self._cache[server_name] = {
+                    'access_token': row['access_token'],
+                    'refresh_token': row['refresh_token'],
+                    'token_type': row['token_type'],
+                    'expires_at': row['expires_at'],
+                    'scopes': row['scopes'].split() if row['scopes'] else []
+                } if row else None
         
-        if row:
-            return {
-                'access_token': row['access_token'],
-                'refresh_token': row['refresh_token'],
-                'token_type': row['token_type'],
-                'expires_at': row['expires_at'],
-                'scopes': row['scopes'].split() if row['scopes'] else []
-            }
-        return None
+        return dict(tokens) if tokens else None
     
-    def is_token_expired(self, server_name: str, buffer_seconds: int = 300) -> bool:
-        """Check if token is expired (with 5 minute buffer by default)"""
-        tokens = self.get_tokens(server_name)
+    def is_token_expired(self, server_name: str, buffer_seconds: int = 300,
+                         tokens: Optional[Dict] = None) -> bool:
+        """
+        Check if token is expired (with 5 minute buffer by default)
+        
+        Pass tokens already read with get_tokens() to skip reading them again.
+        """
+        if tokens is None:
+            tokens = self.get_tokens(server_name)
         if not tokens:
             return True
         
-        return datetime.now().timestamp() > (tokens['expires_at'] - buffer_seconds)
+        return time.time() > (tokens['expires_at'] - buffer_seconds)
     
     def delete_tokens(self, server_name: str):
         """Delete tokens for a server"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("DELETE FROM tokens WHERE server_name = ?", (server_name,))
-        conn.commit()
-        conn.close()
+        with self._lock, self._conn:
+            self._conn.execute(_DELETE_TOKENS_SQL, (server_name,))
+            self._cache[server_name] = None
         print(f"🗑️  Tokens deleted for {server_name}")
     
     def list_servers(self) -> list[str]:
         """List all servers with stored tokens"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.execute("SELECT server_name FROM tokens")
-        servers = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return servers
+        with self._lock:
+            cursor = self._conn.execute("SELECT server_name FROM tokens")
+            return [row[0] for row in cursor.fetchall()]
+    
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+            self._cache.clear()
 
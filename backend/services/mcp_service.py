@@ -3,31 +3,115 @@ MCP service for managing connections to MCP servers.
 """
 
 import asyncio
+import importlib
 import os
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
+from mcp.types import TextContent
 
 from backend.auth.oauth_handler import GoogleOAuthHandler
 from backend.auth.token_store import TokenStore
+from backend.utils import fastjson
+
+
+@dataclass(frozen=True, slots=True)
+class ServerConfig:
+    """An MCP server's configuration with defaults filled in."""
+    key: str
+    name: str
+    transport: str = "stdio"
+    requires_auth: bool = False
+    auth_type: Optional[str] = None
+    command: Optional[str] = None  # stdio transport
+    args: Tuple[str, ...] = ()     # stdio transport
+    url: Optional[str] = None      # sse transport
+    # Tools whose result depends only on their arguments, so repeat calls
+    # can be answered from MCPService's result cache
+    cacheable_tools: FrozenSet[str] = frozenset()
+    # Module whose register_tools(mcp) defines the server's tools, and the
+    # pure tools that may run in-process from it instead of over the transport
+    local_module: Optional[str] = None
+    local_tools: FrozenSet[str] = frozenset()
+    
+    @classmethod
+    def from_dict(cls, key: str, config: dict) -> "ServerConfig":
+        """Normalize one entry of the server configuration dict."""
+        return cls(
+            key=key,
+            name=config["name"],
+            transport=config.get("transport", "stdio"),
+            requires_auth=config.get("requires_auth", False),
+            auth_type=config.get("auth_type"),
+            command=config.get("command"),
+            args=tuple(config.get("args", ())),
+            url=config.get("url"),
+            cacheable_tools=frozenset(config.get("cacheable_tools", ())),
+            local_module=config.get("local_module"),
+            local_tools=frozenset(config.get("local_tools", ())),
+        )
 
 
 class MCPService:
     """Service for managing MCP server connections and tools."""
     
+    # Seconds a discovered tool list is reused before servers are queried again
+    TOOLS_CACHE_TTL = 60.0
+    
+    # Shorter reuse window for a listing that is missing a failed server, so
+    # the server is retried soon without every chat turn waiting on it
+    PARTIAL_TOOLS_CACHE_TTL = 10.0
+    
+    # Results of cacheable tool calls kept, least recently used dropped first
+    TOOL_RESULT_CACHE_SIZE = 1024
+    
     def __init__(self, token_store: TokenStore, oauth_handler: GoogleOAuthHandler):
         self.token_store = token_store
         self.oauth_handler = oauth_handler
         
+        # Environment passed to server processes, captured once
+        self._base_env = dict(os.environ)
+        
+        # (expires_at, authenticated server keys, tools) from the last get_tools()
+        self._tools_cache: Optional[Tuple[float, FrozenSet[str], List[dict]]] = None
+        self._tools_refresh: Optional[asyncio.Task] = None
+        
+        # Open sessions by server key. Each is owned by a task in
+        # _session_tasks that keeps the transport alive, so tool calls reuse
+        # one server process instead of spawning and initializing a new one.
+        self.sessions: Dict[str, ClientSession] = {}
+        self._session_tasks: Dict[str, asyncio.Task] = {}
+        self._session_tokens: Dict[str, Optional[str]] = {}  # access token each session started with
+        self._session_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        
+        # Serializes token refreshes per server
+        self._refresh_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        
+        # Tool name -> owning server key, filled in as servers are listed
+        self.tool_registry: Dict[str, str] = {}
+        
+        # (server key, tool name, JSON arguments) -> result text
+        self._tool_results: OrderedDict[Tuple[str, str, str], str] = OrderedDict()
+        
+        # In-process FastMCP instances for servers with local_tools, by server key
+        self._local_servers: Dict[str, "FastMCP"] = {}
+        
         # MCP Server configurations
-        self.servers = {
+        servers = {
             "calculator": {
                 "name": "Calculator",
                 "transport": "stdio",
                 "command": "python",
                 "args": ["mcp_servers/calculator/server.py"],
                 "requires_auth": False,
+                "cacheable_tools": ["add", "sum", "sum_many", "multiply", "divide"],
+                "local_module": "mcp_servers.calculator.tools",
+                "local_tools": ["add", "sum", "sum_many", "multiply", "divide"],
             },
             "google-drive": {
                 "name": "Google Drive",
@@ -59,153 +143,393 @@ class MCPService:
             #     "requires_auth": False,
             # }
         }
+        self.servers: Dict[str, ServerConfig] = {
+            key: ServerConfig.from_dict(key, config) for key, config in servers.items()
+        }
+        
+        # Server fields that never change at runtime, listed once for get_server_info()
+        self._static_server_info = [
+            {
+                "key": config.key,
+                "name": config.name,
+                "transport": config.transport,
+                "requires_auth": config.requires_auth,
+            }
+            for config in self.servers.values()
+        ]
     
-    async def get_server_env(self, server_key: str) -> dict:
-        """Get environment variables for a specific MCP server."""
-        env = dict(os.environ)
+    async def get_server_env(self, server_key: str, tokens: Optional[dict] = None) -> Optional[dict]:
+        """
+        Get environment variables for a specific MCP server.
+        
+        Servers without auth share one snapshot of the process environment,
+        so callers must not modify the returned dict.
         
+        Args:
+            server_key: Server to build the environment for
+            tokens: The server's stored tokens, if the caller already read them
+        
+        Returns:
+            The environment, or None if the server requires auth and has no
+            usable tokens (none stored, or the refresh failed)
+        """
         server_config = self.servers.get(server_key)
         if not server_config:
-            return env
+            return self._base_env
         
         # Add auth tokens if needed
-        if server_config.get("requires_auth") and server_config.get("auth_type") == "google_oauth":
-            tokens = self.token_store.get_tokens(server_key)
+        if server_config.requires_auth and server_config.auth_type == "google_oauth":
+            if tokens is None:
+                tokens = self.token_store.get_tokens(server_key)
             if tokens:
-                # Check if expired and refresh
-                if self.token_store.is_token_expired(server_key):
-                    print(f"🔄 Token expired for {server_key}, refreshing...")
-                    try:
-                        new_tokens = self.oauth_handler.refresh_access_token(tokens['refresh_token'])
-                        self.token_store.save_tokens(server_key, new_tokens)
-                        tokens = new_tokens
-                    except Exception as e:
-                        print(f"❌ Token refresh failed: {e}")
+                # Refresh ahead of expiry (is_token_expired includes a safety margin)
+                if self.token_store.is_token_expired(server_key, tokens=tokens):
+                    tokens = await self._refresh_tokens(server_key)
+                    if tokens is None:
                         return None
                 
+                env = dict(self._base_env)
                 env["GOOGLE_ACCESS_TOKEN"] = tokens['access_token']
+                # Lets the server refresh the token itself shortly before it expires
+                env["GOOGLE_TOKEN_EXPIRES_AT"] = str(tokens['expires_at'])
                 if tokens.get('refresh_token'):
                     env["GOOGLE_REFRESH_TOKEN"] = tokens['refresh_token']
+                return env
+            
+            # Starting the server without credentials would only fail inside it
+            return None
         
-        return env
+        return self._base_env
 
-    async def _create_client_session(self, server_config: dict, env: dict):
+    async def _refresh_tokens(self, server_key: str) -> Optional[dict]:
+        """
+        Refresh a server's access token, returning the new tokens or None on failure.
+        
+        Concurrent callers for the same server wait on one lock and reuse the
+        first caller's result instead of each hitting the token endpoint.
+        """
+        async with self._refresh_locks[server_key]:
+            tokens = self.token_store.get_tokens(server_key)
+            if not tokens:
+                return None
+            if not self.token_store.is_token_expired(server_key, tokens=tokens):
+                return tokens  # Refreshed while we waited for the lock
+            if not tokens.get('refresh_token'):
+                # Can't succeed; the user has to reconnect the server
+                print(f"❌ No refresh token for {server_key}, re-authentication required")
+                return None
+            
+            print(f"🔄 Token expiring for {server_key}, refreshing...")
+            try:
+                # The refresh is a blocking HTTP call; keep it off the event loop
+                new_tokens = await asyncio.to_thread(
+                    self.oauth_handler.refresh_access_token, tokens['refresh_token']
+                )
+                self.token_store.save_tokens(server_key, new_tokens)
+                return new_tokens
+            except Exception as e:
+                print(f"❌ Token refresh failed: {e}")
+                return None
+
+    def _create_client_session(self, server_config: ServerConfig, env: dict):
         """Create appropriate client session based on transport type."""
-        transport = server_config.get("transport", "stdio")
+        transport = server_config.transport
         
         if transport == "stdio":
             # Stdio transport
             server_params = StdioServerParameters(
-                command=server_config["command"],
-                args=server_config["args"],
+                command=server_config.command,
+                args=list(server_config.args),
                 env=env
             )
             return stdio_client(server_params)
         elif transport == "sse":
             # SSE/HTTP transport
-            url = server_config["url"]
+            url = server_config.url
             return sse_client(url)
         else:
             raise ValueError(f"Unsupported transport type: {transport}")
 
+    async def _get_session(self, server_key: str, tokens: Optional[dict] = None) -> ClientSession:
+        """
+        Return an open session for a server, connecting on first use.
+        
+        A session whose server has since had its access token refreshed is
+        replaced so the server process picks up the new token. tokens are
+        passed on to get_server_env().
+        
+        Raises:
+            ValueError: If the server requires auth and has no usable tokens
+        """
+        server_config = self.servers[server_key]
+        
+        async with self._session_locks[server_key]:
+            env = await self.get_server_env(server_key, tokens)
+            if env is None:
+                raise ValueError(f"Authentication failed for {server_config.name}")
+            token = env.get("GOOGLE_ACCESS_TOKEN")
+            
+            session = self.sessions.get(server_key)
+            if session is not None:
+                if self._session_tokens.get(server_key) == token:
+                    return session
+                await self._close_session(server_key)
+            
+            ready = asyncio.get_running_loop().create_future()
+            self._session_tasks[server_key] = asyncio.create_task(
+                self._hold_session(server_key, server_config, env, ready)
+            )
+            self._session_tokens[server_key] = token
+            return await ready
+    
+    async def _hold_session(self, server_key: str, server_config: ServerConfig, env: dict,
+                            ready: asyncio.Future):
+        """
+        Open a session, hand it over through ready, and keep it open until cancelled.
+        
+        The MCP transports use anyio task groups, which must be exited by the
+        task that entered them, so one long-lived task owns each connection.
+        """
+        try:
+            async with self._create_client_session(server_config, env) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.sessions[server_key] = session
+                    ready.set_result(session)
+                    await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            if not ready.done():
+                ready.cancel()
+            raise
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                print(f"❌ Lost connection to {server_config.name}: {e}")
+        finally:
+            # Forget the session unless a newer connection already replaced it
+            if self._session_tasks.get(server_key) is asyncio.current_task():
+                del self._session_tasks[server_key]
+                self.sessions.pop(server_key, None)
+                self._session_tokens.pop(server_key, None)
+    
+    async def _close_session(self, server_key: str):
+        """Close a server's pooled session, if any."""
+        task = self._session_tasks.pop(server_key, None)
+        self.sessions.pop(server_key, None)
+        self._session_tokens.pop(server_key, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    
+    async def disconnect_server(self, server_key: str):
+        """
+        Forget a server after its tokens were deleted.
+        
+        Closes its pooled session and drops its tools from tool_registry and
+        its cached tool results, so later calls to its tools fail fast
+        instead of restarting the server without credentials.
+        """
+        for tool_name in [name for name, key in self.tool_registry.items() if key == server_key]:
+            del self.tool_registry[tool_name]
+        for cache_key in [key for key in self._tool_results if key[0] == server_key]:
+            del self._tool_results[cache_key]
+        self.invalidate_tools_cache()
+        await self._close_session(server_key)
+    
+    async def aclose(self):
+        """Close all pooled sessions and stop their server processes."""
+        await asyncio.gather(*(self._close_session(key) for key in list(self._session_tasks)))
+
+    def _stored_tokens(self) -> Dict[str, dict]:
+        """Stored tokens of the servers that need auth and have them, by server key."""
+        stored = {}
+        for key, config in self.servers.items():
+            if config.requires_auth:
+                tokens = self.token_store.get_tokens(key)
+                if tokens:
+                    stored[key] = tokens
+        return stored
+    
+    def invalidate_tools_cache(self):
+        """Drop the cached tool listing, e.g. after a server is connected or disconnected."""
+        self._tools_cache = None
+    
     async def get_tools(self):
-        """Connect to all available MCP servers and get tools."""
-        all_tools = []
+        """
+        Get tools from all available MCP servers in OpenAI function format.
         
+        Listings are cached. After TOOLS_CACHE_TTL seconds the cached listing
+        is still returned while a background task re-lists the servers, so a
+        chat turn only waits on MCP servers when nothing usable is cached.
+        invalidate_tools_cache() (called by the OAuth routes) or a change in
+        the set of authenticated servers forces a fresh listing.
+        
+        The cached list itself is returned, not a copy, so every request
+        reuses the same tool definitions; callers must not modify it.
+        """
+        stored_tokens = self._stored_tokens()
+        cached = self._tools_cache
+        if cached and cached[1] == frozenset(stored_tokens):
+            if time.monotonic() >= cached[0]:
+                self._refresh_tools_in_background(stored_tokens)
+            return cached[2]
+        
+        return await self._list_tools(stored_tokens)
+    
+    def _refresh_tools_in_background(self, stored_tokens: Dict[str, dict]):
+        """Start a background re-listing unless one is already running."""
+        if self._tools_refresh is None or self._tools_refresh.done():
+            self._tools_refresh = asyncio.create_task(self._list_tools(stored_tokens))
+    
+    async def _list_tools(self, stored_tokens: Dict[str, dict]) -> List[dict]:
+        """
+        List tools from every usable server and cache the result.
+        
+        A listing missing a server that failed (e.g. a local server that is
+        not running) is cached for PARTIAL_TOOLS_CACHE_TTL only, so the
+        failed server is retried soon.
+        
+        stored_tokens (from _stored_tokens()) decides which auth servers are
+        listed and is handed to each connection, so the token store is read
+        once per server.
+        """
+        configs = []
         for server_key, server_config in self.servers.items():
             # Skip servers that require auth but don't have tokens
-            if server_config.get("requires_auth"):
-                if not self.token_store.get_tokens(server_key):
-                    print(f"⏭️  Skipping {server_config['name']} - not authenticated")
-                    continue
-            
-            try:
-                # Get environment for this server
-                env = await self.get_server_env(server_key)
-                if env is None:  # Auth failed
-                    continue
-                
-                # Create appropriate client based on transport
-                async with self._create_client_session(server_config, env) as (read, write):
-                    async with ClientSession(read, write) as session:
-                        await session.initialize()
-                        
-                        # Get tools
-                        tools_response = await session.list_tools()
-                        
-                        # Convert MCP tools to OpenAI function format
-                        for tool in tools_response.tools:
-                            all_tools.append({
-                                "type": "function",
-                                "function": {
-                                    "name": tool.name,
-                                    "description": tool.description,
-                                    "parameters": tool.inputSchema,
-                                },
-                                "_server": server_key  # Track which server owns this tool
-                            })
-                        
-                        print(f"✅ Loaded {len(tools_response.tools)} tools from {server_config['name']}")
-            
-            except Exception as e:
-                print(f"❌ Failed to load tools from {server_config['name']}: {e}")
+            if server_config.requires_auth and server_key not in stored_tokens:
+                print(f"⏭️  Skipping {server_config.name} - not authenticated")
                 continue
+            configs.append((server_key, server_config))
         
+        # Connect to every server at once; total latency is the slowest server
+        results = await asyncio.gather(
+            *(self._load_tools_from_server(key, config, stored_tokens.get(key))
+              for key, config in configs),
+            return_exceptions=True
+        )
+        
+        all_tools = []
+        complete = True
+        for (server_key, server_config), result in zip(configs, results):
+            if isinstance(result, BaseException):
+                print(f"❌ Failed to load tools from {server_config.name}: {result}")
+                complete = False
+                continue
+            all_tools.extend(result)
+        
+        ttl = self.TOOLS_CACHE_TTL if complete else self.PARTIAL_TOOLS_CACHE_TTL
+        self._tools_cache = (time.monotonic() + ttl, frozenset(stored_tokens), all_tools)
         return all_tools
+    
+    async def _load_tools_from_server(self, server_key: str, server_config: ServerConfig,
+                                      tokens: Optional[dict] = None) -> List[dict]:
+        """
+        List one server's tools in OpenAI function format.
+        
+        Args:
+            server_key: Server to list
+            server_config: The server's entry in self.servers
+            tokens: The server's stored tokens, if it requires auth
+        
+        Raises:
+            ValueError: If the server's auth token could not be refreshed
+        """
+        session = await self._get_session(server_key, tokens)
+        tools_response = await session.list_tools()
+        
+        # Convert MCP tools to OpenAI function format
+        tools = []
+        for tool in tools_response.tools:
+            tools.append({
+                "type": "function",
+                "function": {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters": tool.inputSchema,
+                },
+                "_server": server_key  # Track which server owns this tool
+            })
+            self.tool_registry[tool.name] = server_key
+        
+        print(f"✅ Loaded {len(tools_response.tools)} tools from {server_config.name}")
+        
+        return tools
 
-    async def call_tool(self, tool_name: str, arguments: dict, server_key: str = None):
-        """Execute an MCP tool on the appropriate server."""
+    async def call_tool(self, tool_name: str, arguments: dict, server_key: str = None,
+                        raw_arguments: Optional[str] = None):
+        """
+        Execute an MCP tool on the appropriate server.
+        
+        Without an explicit server_key the owning server is looked up in
+        tool_registry, listing the servers first if the tool isn't known yet.
+        Calls to a server's cacheable_tools are answered from a result cache
+        when the same arguments were seen before. raw_arguments, the JSON
+        text arguments were parsed from, is used as the cache key as-is
+        instead of serializing arguments again. A server's local_tools run
+        in-process, skipping the round trip to its server process.
+        
+        Raises:
+            ValueError: If no server provides the tool
+        """
         # Find which server has this tool
         if not server_key:
-            # Try to find the tool in any server
-            for key, config in self.servers.items():
-                if config.get("requires_auth") and not self.token_store.get_tokens(key):
-                    continue
-                server_key = key
-                break
+            server_key = self.tool_registry.get(tool_name)
+        if not server_key:
+            await self.get_tools()
+            server_key = self.tool_registry.get(tool_name)
         
         if not server_key or server_key not in self.servers:
             raise ValueError(f"No server found for tool {tool_name}")
         
-        server_config = self.servers[server_key]
+        cache_key = None
+        if tool_name in self.servers[server_key].cacheable_tools:
+            cache_key = (server_key, tool_name, raw_arguments or fastjson.dumps_sorted(arguments))
+            cached = self._tool_results.get(cache_key)
+            if cached is not None:
+                self._tool_results.move_to_end(cache_key)
+                return cached
         
-        # Get environment for this server
-        env = await self.get_server_env(server_key)
-        if env is None:
-            raise ValueError(f"Authentication failed for {server_config['name']}")
+        if tool_name in self.servers[server_key].local_tools:
+            result = await self._local_server(server_key).call_tool(tool_name, arguments)
+        else:
+            session = await self._get_session(server_key)
+            result = await session.call_tool(tool_name, arguments)
         
-        # Create appropriate client based on transport
-        async with self._create_client_session(server_config, env) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                result = await session.call_tool(tool_name, arguments)
-                
-                # Extract text from result
-                result_text = ""
-                for content in result.content:
-                    if hasattr(content, 'text'):
-                        result_text += content.text
-                
-                return result_text
+        # Extract text from result
+        result_text = "".join(content.text for content in result.content if isinstance(content, TextContent))
+        
+        if cache_key is not None:
+            self._tool_results[cache_key] = result_text
+            if len(self._tool_results) > self.TOOL_RESULT_CACHE_SIZE:
+                self._tool_results.popitem(last=False)
+        return result_text
 
+    def _local_server(self, server_key: str):
+        """
+        In-process FastMCP instance with a server's tools, created on first use.
+        
+        The tools are registered from the server's local_module, so they
+        validate arguments and format results exactly as the server does.
+        """
+        local_server = self._local_servers.get(server_key)
+        if local_server is None:
+            from fastmcp import FastMCP
+            
+            server_config = self.servers[server_key]
+            local_server = FastMCP(server_config.name)
+            importlib.import_module(server_config.local_module).register_tools(local_server)
+            self._local_servers[server_key] = local_server
+        return local_server
+    
+    def _auth_status(self, server_info: dict) -> bool:
+        """Whether a server is usable: no auth needed, or unexpired tokens stored."""
+        # is_token_expired() is also True when no tokens are stored
+        return not server_info["requires_auth"] or not self.token_store.is_token_expired(server_info["key"])
+    
     def get_server_info(self):
         """Get list of available MCP servers and their auth status."""
-        servers = []
-        for key, config in self.servers.items():
-            server_info = {
-                "key": key,
-                "name": config["name"],
-                "transport": config.get("transport", "stdio"),
-                "requires_auth": config.get("requires_auth", False),
-                "authenticated": False
-            }
-            
-            if config.get("requires_auth"):
-                tokens = self.token_store.get_tokens(key)
-                server_info["authenticated"] = tokens is not None and not self.token_store.is_token_expired(key)
-            else:
-                server_info["authenticated"] = True  # No auth needed
-            
-            servers.append(server_info)
-        
-        return servers
\ No newline at end of file
+        return [
+            {**info, "authenticated": self._auth_status(info)}
+            for info in self._static_server_info
+        ]
\ No newline at end of file
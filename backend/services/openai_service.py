@@ -2,24 +2,102 @@
 OpenAI service for handling chat completions.
 """
 
-import json
+import importlib.util
 
-from openai import OpenAI
+# Connection pool for each OpenAI client. Keep-alive lets the second completion
+# of a chat turn (and concurrent chats) reuse an open TLS connection.
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 60.0  # seconds
+
+
+def _http_client_options() -> dict:
+    """httpx options for the OpenAI clients; HTTP/2 is used when h2 is installed."""
+    import httpx
+    
+    return {
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        "http2": importlib.util.find_spec("h2") is not None,
+    }
+
+
+def _cache_options(cache_key: str = None) -> dict:
+    """
+    Extra request options routing requests that share cache_key to the same
+    OpenAI prompt cache, so a conversation's unchanged prefix is reused.
+    Sent as a raw body field so older SDK versions accept it.
+    """
+    return {"extra_body": {"prompt_cache_key": cache_key}} if cache_key else {}
 
 
 class OpenAIService:
     """Service for OpenAI chat completions."""
     
     def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
+        self._client = None
+        self._async_client = None
     
-    def chat_completion(self, messages: list, tools: list = None, model: str = "gpt-4o-mini"):
+    @property
+    def client(self):
+        """OpenAI client, created (and the SDK imported) on first use."""
+        if self._client is None:
+            from openai import DefaultHttpxClient, OpenAI
+            self._client = OpenAI(
+                api_key=self.api_key,
+                http_client=DefaultHttpxClient(**_http_client_options())
+            )
+        return self._client
+    
+    @property
+    def async_client(self):
+        """AsyncOpenAI client for use on the backend event loop, created on first use."""
+        if self._async_client is None:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                http_client=DefaultAsyncHttpxClient(**_http_client_options())
+            )
+        return self._async_client
+    
+    async def aclose(self):
+        """Close both clients and their connection pools, if they were created."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+    
+    def chat_completion(self, messages: list, tools: list = None, model: str = "gpt-4o-mini",
+                        cache_key: str = None, tool_choice: str = "auto"):
         """Create a chat completion with optional tools."""
         return self.client.chat.completions.create(
             model=model,
             messages=messages,
             tools=tools if tools else None,
-            tool_choice="auto" if tools else None,
+            tool_choice=tool_choice if tools else None,
+            **_cache_options(cache_key),
+        )
+    
+    async def async_chat_completion(self, messages: list, tools: list = None, model: str = "gpt-4o-mini",
+                                    cache_key: str = None, tool_choice: str = "auto"):
+        """
+        Create a chat completion with optional tools without blocking the event loop.
+        
+        Pass tool_choice="none" to get a plain reply while still sending the
+        tools, keeping the request prefix identical for OpenAI's prompt cache.
+        """
+        return await self.async_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            tools=tools if tools else None,
+            tool_choice=tool_choice if tools else None,
+            **_cache_options(cache_key),
         )
     
     def chat_completion_with_tools(self, messages: list, model: str = "gpt-4o-mini"):
@@ -27,4 +105,16 @@ class OpenAIService:
         return self.client.chat.completions.create(
             model=model,
             messages=messages,
+        )
+    
+    def stream_chat_completion(self, messages: list, tools: list = None, model: str = "gpt-4o-mini",
+                               cache_key: str = None, tool_choice: str = "auto"):
+        """Create a streaming chat completion; yields chunks as they arrive."""
+        return self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            tools=tools if tools else None,
+            tool_choice=tool_choice if tools else None,
+            stream=True,
+            **_cache_options(cache_key),
         )
\ No newline at end of file
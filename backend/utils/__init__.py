@@ -0,0 +1,12 @@
+"""
+Shared backend utilities.
+
+Modules:
+- fastjson: JSON encode/decode and a Flask JSON provider using orjson when installed
+- event_loop: Background asyncio loop that sync Flask views submit coroutines to
+
+Usage:
+    from backend.utils import fastjson
+    
+    payload = fastjson.loads(raw)
+"""
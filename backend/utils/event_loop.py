@@ -0,0 +1,107 @@
+"""
+Background asyncio event loop for synchronous Flask handlers.
+
+Flask views are synchronous, but MCP calls are coroutines. Instead of
+creating and tearing down an event loop on every request, one loop runs
+forever on a daemon thread and views submit coroutines to it.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Coroutine, Optional
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional (installed with the server extra)
+    uvloop = None
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """A new event loop, libuv-based when uvloop is installed."""
+    return uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+
+
+async def _cancel_pending(loop: asyncio.AbstractEventLoop):
+    """Cancel every other task on the loop, wait for them, and close async generators."""
+    tasks = [task for task in asyncio.all_tasks(loop) if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await loop.shutdown_asyncgens()
+
+
+class BackgroundEventLoop:
+    """An asyncio event loop running on its own daemon thread."""
+    
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        The running loop, started on first use.
+        
+        A forked worker process (e.g. gunicorn with preload) does not inherit
+        the parent's loop thread, so each process starts its own.
+        """
+        if self._loop is None or self._pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._pid != os.getpid():
+                    loop = _new_event_loop()
+                    self._thread = threading.Thread(
+                        target=loop.run_forever,
+                        name="backend-event-loop",
+                        daemon=True
+                    )
+                    self._thread.start()
+                    self._pid = os.getpid()
+                    self._loop = loop
+        return self._loop
+    
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+        """Schedule a coroutine on the background loop without waiting for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the background loop and wait for its result.
+        
+        Args:
+            coro: Coroutine to execute
+            timeout: Seconds to wait before cancelling the coroutine and
+                raising TimeoutError (default: no limit)
+            
+        Returns:
+            The coroutine's return value; its exception is re-raised here
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            # Before Python 3.11 this is not the builtin TimeoutError that
+            # callers catch
+            raise TimeoutError(f"Coroutine did not finish within {timeout} seconds") from None
+    
+    def close(self, timeout: Optional[float] = None):
+        """Stop the loop and wait for its thread to exit."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or self._pid != os.getpid():
+                return
+            self._loop = self._thread = None
+        
+        # Cancel work still pending (e.g. a warm-up still connecting) so the
+        # loop isn't closed with running tasks and open async generators
+        try:
+            asyncio.run_coroutine_threadsafe(_cancel_pending(loop), loop).result(timeout)
+        except concurrent.futures.TimeoutError:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
\ No newline at end of file
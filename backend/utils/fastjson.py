@@ -0,0 +1,82 @@
+"""
+Fast JSON helpers.
+
+Uses orjson when it is installed and falls back to the stdlib json module
+otherwise. Output is always compact; these helpers are for payloads that
+only machines read (tool arguments, OAuth state, API responses), not for
+pretty-printing.
+"""
+
+import json
+from typing import Any, Union
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+
+if orjson is not None:
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize obj to compact UTF-8 encoded JSON."""
+        return orjson.dumps(obj)
+
+    def dumps(obj: Any) -> str:
+        """Serialize obj to a compact JSON string."""
+        return orjson.dumps(obj).decode()
+
+    def dumps_sorted(obj: Any) -> str:
+        """Serialize obj to compact JSON with sorted keys, e.g. for cache keys."""
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode()
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse a JSON document from str or bytes."""
+        return orjson.loads(data)
+else:
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize obj to compact UTF-8 encoded JSON."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def dumps(obj: Any) -> str:
+        """Serialize obj to a compact JSON string."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    def dumps_sorted(obj: Any) -> str:
+        """Serialize obj to compact JSON with sorted keys, e.g. for cache keys."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, sort_keys=True)
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse a JSON document from str or bytes."""
+        return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that renders jsonify() responses with orjson.
+    
+    Datetimes still go through Flask's default hook so they keep the HTTP
+    date format. Debug mode (indented output) and installs without orjson
+    use the stdlib provider unchanged. Request bodies (request.json) are
+    parsed with orjson too.
+    """
+    
+    if orjson is not None:
+        _options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._options),
+            mimetype=self.mimetype
+        )
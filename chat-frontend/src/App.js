@@ -120,27 +120,59 @@ function App() {
     setLoading(true);
 
     try {
-      const response = await fetch('http://localhost:5001/api/chat', {
+      const response = await fetch('http://localhost:5001/api/chat/stream', {
         method: 'POST',
+        credentials: 'include',  // Session cookie keys the conversation history
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ message: userMessage }),
       });
 
-      const data = await response.json();
-      
-      if (data.error) {
+      if (!response.ok) {
+        const data = await response.json();
         setMessages(prev => [...prev, { 
           role: 'error', 
           content: `Error: ${data.error}` 
         }]);
-      } else {
-        // Add assistant response
-        const assistantMessage = {
-          role: 'assistant',
-          content: data.response,
-          toolCalls: data.tool_calls || []
-        };
-        setMessages(prev => [...prev, assistantMessage]);
+        return;
+      }
+
+      // Add an empty assistant message and fill it in as events arrive
+      setMessages(prev => [...prev, { role: 'assistant', content: '', toolCalls: [] }]);
+
+      const updateAssistant = (update) => {
+        setMessages(prev => {
+          const last = prev[prev.length - 1];
+          return [...prev.slice(0, -1), update(last)];
+        });
+      };
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+
+        for (const event of events) {
+          if (!event.startsWith('data: ')) continue;
+          const data = JSON.parse(event.slice(6));
+
+          if (data.delta) {
+            updateAssistant(msg => ({ ...msg, content: msg.content + data.delta }));
+          } else if (data.tool_call) {
+            updateAssistant(msg => ({ ...msg, toolCalls: [...msg.toolCalls, data.tool_call] }));
+          } else if (data.error) {
+            setMessages(prev => [...prev, { 
+              role: 'error', 
+              content: `Error: ${data.error}` 
+            }]);
+          }
+        }
       }
     } catch (error) {
       setMessages(prev => [...prev, { 
@@ -154,7 +186,7 @@ function App() {
 
   const clearChat = async () => {
     try {
-      await fetch('http://localhost:5001/api/clear', { method: 'POST' });
+      await fetch('http://localhost:5001/api/clear', { method: 'POST', credentials: 'include' });
       setMessages([]);
     } catch (error) {
       console.error('Error clearing chat:', error);
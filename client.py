@@ -11,6 +11,7 @@ This client connects to the MCP server and demonstrates how to:
 import asyncio
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.types import TextContent
 
 
 async def run_client():
@@ -57,7 +58,7 @@ async def run_client():
                 
                 # Parse the result
                 for content in result.content:
-                    if hasattr(content, 'text'):
+                    if isinstance(content, TextContent):
                         print(f"  {test_case['a']} + {test_case['b']} → {content.text}")
             
             # Test the prompt
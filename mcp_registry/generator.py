@@ -138,62 +138,40 @@ class ServerGeneratorManager:
         generated_dir = self.registry.get_server_directory(server_id) / "generated"
         generated_dir.mkdir(exist_ok=True)
         
-        # Save discovery for generator to use
-        discovery_file = generated_dir / "discovery_input.json"
-        with open(discovery_file, 'w') as f:
-            json.dump(discovery_result.model_dump(), f, indent=2, default=str)
+        # Mock responses, resource content and test cases come from one Claude call
+        try:
+            from ai_generation.server_generator import generate_ai_all, generate_ai_mock_server
+        except ImportError:
+            raise FileOperationError(str(generated_dir), "generate", "AI generation service not available")
         
-        # Run server generator
+        discovery_data = discovery_result.model_dump(mode="json")
         try:
-            from ai_generation.server_generator import generate_mock_server
-            
-            mock_code = generate_mock_server(
-                discovery_file=str(discovery_file),
-                server_name=config.name
+            mock_responses, resource_content, test_cases = generate_ai_all(
+                discovery_data["tools"], discovery_data["resources"]
             )
             
-            # Save mock server
-            mock_server_path = generated_dir / "server.py"
-            mock_server_path.write_text(mock_code)
-            
-            # Also create tools.py for compatibility
-            tools_path = generated_dir / "tools.py"
-            tools_code = self._extract_tools_module(mock_code)
-            tools_path.write_text(tools_code)
-            
-        except ImportError:
-            raise FileOperationError(str(generated_dir), "generate", "AI generation service not available")
+            # Writes server.py and tools.py
+            generate_ai_mock_server(
+                discovery_data, generated_dir,
+                mock_payloads=(mock_responses, resource_content)
+            )
         except Exception as e:
             raise FileOperationError(str(generated_dir), "generate", str(e))
         
-        # Run evaluations generator
+        # Save evaluations
         try:
-            from ai_generation.evals_generator import generate_evaluations
-            
-            evaluations = generate_evaluations(
-                discovery_file=str(discovery_file),
-                server_name=config.name
-            )
-            
-            # Save evaluations
+            evaluations = {
+                "server_info": {
+                    "source": discovery_result.server_path,
+                    "generated_at": datetime.now().isoformat(),
+                    "tools_count": len(discovery_data["tools"])
+                },
+                "evaluations": test_cases
+            }
             evaluations_path = generated_dir / "evaluations.json"
-            evaluations_path.write_text(evaluations)
-            
-        except ImportError:
-            handle_warning("Evaluations generator not available", server_id)
+            evaluations_path.write_text(json.dumps(evaluations, indent=2))
         except Exception as e:
-            handle_warning(f"Failed to generate evaluations: {e}", server_id)
-    
-    def _extract_tools_module(self, mock_code: str) -> str:
-        """Extract tools into a separate module for compatibility."""
-        return '''"""
-Generated tools module for compatibility.
-"""
-
-from .server import mcp
-
-# Tools are defined in server.py
-'''
+            handle_warning(f"Failed to save evaluations: {e}", server_id)
     
     def _generate_config_template(self) -> str:
         """Generate a server config template."""
@@ -8,8 +8,11 @@ and managing Gmail messages.
 import base64
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from functools import partial
 from typing import Any, Dict, List
 
 from fastmcp import FastMCP
@@ -19,6 +22,108 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from mcp_servers.shared.google_auth import get_gmail_service
 
+# Gmail accepts up to 100 calls in one batch request, but rate-limits larger
+# batches; its guidance is to keep them at 50 or fewer
+BATCH_SIZE = 50
+
+# Times the calls in a batch that hit a transient error (rate limited or a
+# server error) are sent again, and the seconds waited before the first
+# retry (doubled after each)
+BATCH_RETRIES = 2
+BATCH_RETRY_DELAY = 1.0
+
+# Sends the batches of long listings; shared by all tool calls so concurrent
+# listings never put more than two batches in flight against the rate limit
+_batch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gmail-batch")
+
+# One listing entry each; listings collect entries and join them once
+MESSAGE_ENTRY = "{unread_marker}📧 {subject}\n   From: {sender}\n   Date: {date}\n   ID: {id}\n\n"
+LABEL_ENTRY = "🏷️  {name}\n   ID: {id}\n   Type: {label_type}\n\n"
+
+
+def _is_transient(exception: Exception) -> bool:
+    """Whether a failed call may succeed if sent again: rate limited or a server error."""
+    if not isinstance(exception, HttpError):
+        return False
+    status = exception.resp.status
+    return status == 429 or status >= 500
+
+
+def _fetch_metadata_batch(service, message_ids: List[str]) -> Dict[str, dict]:
+    """Fetch metadata for up to BATCH_SIZE messages in one batch request.
+    
+    Calls that hit a transient error are retried in a new batch up to
+    BATCH_RETRIES times. Messages that fail otherwise (e.g. deleted since
+    they were listed) or keep failing are left out of the result.
+    """
+    metadata = {}
+    retryable = []
+    
+    def collect(request_id, response, exception):
+        if exception is None:
+            metadata[request_id] = response
+        elif _is_transient(exception):
+            retryable.append(request_id)
+    
+    pending = message_ids
+    delay = BATCH_RETRY_DELAY
+    for attempt in range(BATCH_RETRIES + 1):
+        if attempt:
+            time.sleep(delay)
+            delay *= 2
+        retryable.clear()
+        batch = service.new_batch_http_request(callback=collect)
+        for message_id in pending:
+            batch.add(
+                service.users().messages().get(
+                    userId='me',
+                    id=message_id,
+                    format='metadata',
+                    metadataHeaders=['From', 'Subject', 'Date'],
+                    fields='labelIds,payload/headers(name,value)'
+                ),
+                request_id=message_id
+            )
+        batch.execute()
+        if not retryable:
+            break
+        pending = list(retryable)
+    
+    return metadata
+
+
+def _get_messages_metadata(service, message_ids: List[str]) -> Dict[str, dict]:
+    """Fetch the From, Subject and Date headers of several messages.
+    
+    The messages.get calls are sent in batch requests of up to BATCH_SIZE
+    calls each, so listing N messages takes one round trip instead of N.
+    Longer listings send up to two batches at a time from worker threads.
+    
+    Args:
+        service: Gmail API service
+        message_ids: IDs of the messages to fetch
+        
+    Returns:
+        Message metadata keyed by message ID; messages that could not be
+        fetched after retrying are missing
+        
+    Raises:
+        HttpError: If a batch request as a whole failed
+    """
+    chunks = [message_ids[start:start + BATCH_SIZE] for start in range(0, len(message_ids), BATCH_SIZE)]
+    if len(chunks) <= 1:
+        return _fetch_metadata_batch(service, message_ids)
+    
+    metadata = {}
+    for chunk_metadata in _batch_pool.map(partial(_fetch_metadata_batch, service), chunks):
+        metadata.update(chunk_metadata)
+    return metadata
+
+
+def _skipped_note(skipped: int) -> str:
+    """Listing footer for messages whose details could not be fetched."""
+    return f"⚠️  {skipped} messages could not be loaded\n" if skipped else ""
+
 
 def register_tools(mcp: FastMCP):
     """Register all Gmail tools with the given FastMCP instance."""
@@ -49,16 +154,15 @@ def register_tools(mcp: FastMCP):
             if not messages:
                 return "No messages found in Gmail."
             
-            output = f"Found {len(messages)} messages:\n\n"
+            parts = [f"Found {len(messages)} messages:\n\n"]
+            
+            # Get details for all messages in batched requests
+            metadata = _get_messages_metadata(service, [msg['id'] for msg in messages])
             
-            # Get details for each message
             for msg in messages:
-                msg_data = service.users().messages().get(
-                    userId='me',
-                    id=msg['id'],
-                    format='metadata',
-                    metadataHeaders=['From', 'Subject', 'Date']
-                ).execute()
+                msg_data = metadata.get(msg['id'])
+                if msg_data is None:
+                    continue
                 
                 headers = msg_data['payload']['headers']
                 subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
@@ -70,12 +174,16 @@ def register_tools(mcp: FastMCP):
                 is_unread = 'UNREAD' in labels
                 unread_marker = '🔵 ' if is_unread else ''
                 
-                output += f"{unread_marker}📧 {subject}\n"
-                output += f"   From: {sender}\n"
-                output += f"   Date: {date}\n"
-                output += f"   ID: {msg['id']}\n\n"
+                parts.append(MESSAGE_ENTRY.format(
+                    unread_marker=unread_marker,
+                    subject=subject,
+                    sender=sender,
+                    date=date,
+                    id=msg['id']
+                ))
             
-            return output
+            parts.append(_skipped_note(len(messages) - len(metadata)))
+            return "".join(parts)
             
         except HttpError as error:
             return f"An error occurred: {error}"
@@ -108,16 +216,15 @@ def register_tools(mcp: FastMCP):
             if not messages:
                 return f"No messages found matching query: '{query}'"
             
-            output = f"Found {len(messages)} messages matching '{query}':\n\n"
+            parts = [f"Found {len(messages)} messages matching '{query}':\n\n"]
+            
+            # Get details for all messages in batched requests
+            metadata = _get_messages_metadata(service, [msg['id'] for msg in messages])
             
-            # Get details for each message
             for msg in messages:
-                msg_data = service.users().messages().get(
-                    userId='me',
-                    id=msg['id'],
-                    format='metadata',
-                    metadataHeaders=['From', 'Subject', 'Date']
-                ).execute()
+                msg_data = metadata.get(msg['id'])
+                if msg_data is None:
+                    continue
                 
                 headers = msg_data['payload']['headers']
                 subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
@@ -129,12 +236,16 @@ def register_tools(mcp: FastMCP):
                 is_unread = 'UNREAD' in labels
                 unread_marker = '🔵 ' if is_unread else ''
                 
-                output += f"{unread_marker}📧 {subject}\n"
-                output += f"   From: {sender}\n"
-                output += f"   Date: {date}\n"
-                output += f"   ID: {msg['id']}\n\n"
+                parts.append(MESSAGE_ENTRY.format(
+                    unread_marker=unread_marker,
+                    subject=subject,
+                    sender=sender,
+                    date=date,
+                    id=msg['id']
+                ))
             
-            return output
+            parts.append(_skipped_note(len(messages) - len(metadata)))
+            return "".join(parts)
             
         except HttpError as error:
             return f"An error occurred: {error}"
@@ -154,11 +265,12 @@ def register_tools(mcp: FastMCP):
         try:
             service = get_gmail_service()
             
-            # Get message
+            # Get message, keeping only the headers and body data rendered below
             msg_data = service.users().messages().get(
                 userId='me',
                 id=message_id,
-                format='full'
+                format='full',
+                fields='payload(headers(name,value),body/data,parts(mimeType,body/data))'
             ).execute()
             
             headers = msg_data['payload']['headers']
@@ -171,15 +283,17 @@ def register_tools(mcp: FastMCP):
             body = ""
             if 'parts' in msg_data['payload']:
                 for part in msg_data['payload']['parts']:
+                    # The fields projection leaves out a body without data
+                    part_body = part.get('body', {})
                     if part['mimeType'] == 'text/plain':
-                        if 'data' in part['body']:
-                            body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
+                        if 'data' in part_body:
+                            body = base64.urlsafe_b64decode(part_body['data']).decode('utf-8')
                             break
                     elif part['mimeType'] == 'text/html':
-                        if 'data' in part['body']:
-                            body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
+                        if 'data' in part_body:
+                            body = base64.urlsafe_b64decode(part_body['data']).decode('utf-8')
             else:
-                if 'data' in msg_data['payload']['body']:
+                if 'data' in msg_data['payload'].get('body', {}):
                     body = base64.urlsafe_b64decode(msg_data['payload']['body']['data']).decode('utf-8')
             
             # Format output
@@ -212,15 +326,14 @@ def register_tools(mcp: FastMCP):
         try:
             service = get_gmail_service()
             
-            # Get unread messages
-            results = service.users().messages().list(
+            # The UNREAD label keeps an exact count, unlike a search's resultSizeEstimate
+            label = service.users().labels().get(
                 userId='me',
-                q='is:unread',
-                maxResults=1
+                id='UNREAD',
+                fields='messagesUnread'
             ).execute()
             
-            # Get the total count from resultSizeEstimate
-            unread_count = results.get('resultSizeEstimate', 0)
+            unread_count = label.get('messagesUnread', 0)
             
             return f"📬 You have {unread_count} unread message{'s' if unread_count != 1 else ''} in your inbox."
             
@@ -340,15 +453,16 @@ def register_tools(mcp: FastMCP):
             if not labels:
                 return "No labels found."
             
-            output = f"Found {len(labels)} labels:\n\n"
+            parts = [f"Found {len(labels)} labels:\n\n"]
             
             for label in labels:
-                label_type = label.get('type', 'user')
-                output += f"🏷️  {label['name']}\n"
-                output += f"   ID: {label['id']}\n"
-                output += f"   Type: {label_type}\n\n"
+                parts.append(LABEL_ENTRY.format(
+                    name=label['name'],
+                    id=label['id'],
+                    label_type=label.get('type', 'user')
+                ))
             
-            return output
+            return "".join(parts)
             
         except HttpError as error:
             return f"An error occurred: {error}"
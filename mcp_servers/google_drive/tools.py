@@ -19,6 +19,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from mcp_servers.shared.google_auth import get_drive_service, get_sheets_service
 
+# One listing entry each; listings collect entries and join them once
+FILE_ENTRY = "📄 {name}\n   ID: {id}\n   Type: {mime_type}\n   Modified: {modified}\n\n"
+FOLDER_ENTRY = "📁 {name}\n   ID: {id}\n   Modified: {modified}\n\n"
+
 
 def register_tools(mcp: FastMCP):
     """Register all Google Drive tools with the given FastMCP instance."""
@@ -47,15 +51,17 @@ def register_tools(mcp: FastMCP):
             if not items:
                 return "No files found in Google Drive."
             
-            output = f"Found {len(items)} files in Google Drive:\n\n"
+            parts = [f"Found {len(items)} files in Google Drive:\n\n"]
             
             for item in items:
-                output += f"📄 {item['name']}\n"
-                output += f"   ID: {item['id']}\n"
-                output += f"   Type: {item.get('mimeType', 'Unknown')}\n"
-                output += f"   Modified: {item.get('modifiedTime', 'Unknown')}\n\n"
+                parts.append(FILE_ENTRY.format(
+                    name=item['name'],
+                    id=item['id'],
+                    mime_type=item.get('mimeType', 'Unknown'),
+                    modified=item.get('modifiedTime', 'Unknown')
+                ))
             
-            return output
+            return "".join(parts)
             
         except HttpError as error:
             return f"An error occurred: {error}"
@@ -99,15 +105,17 @@ def register_tools(mcp: FastMCP):
             if not items:
                 return f"No files found matching query: '{query}' (searched as: {formatted_query})"
             
-            output = f"Found {len(items)} files matching '{query}':\n\n"
+            parts = [f"Found {len(items)} files matching '{query}':\n\n"]
             
             for item in items:
-                output += f"📄 {item['name']}\n"
-                output += f"   ID: {item['id']}\n"
-                output += f"   Type: {item.get('mimeType', 'Unknown')}\n"
-                output += f"   Modified: {item.get('modifiedTime', 'Unknown')}\n\n"
+                parts.append(FILE_ENTRY.format(
+                    name=item['name'],
+                    id=item['id'],
+                    mime_type=item.get('mimeType', 'Unknown'),
+                    modified=item.get('modifiedTime', 'Unknown')
+                ))
             
-            return output
+            return "".join(parts)
             
         except HttpError as error:
             return f"An error occurred: {error}"
@@ -130,7 +138,7 @@ def register_tools(mcp: FastMCP):
             # Get file metadata
             file = service.files().get(
                 fileId=file_id,
-                fields="id, name, mimeType, size, createdTime, modifiedTime, owners, permissions"
+                fields="id, name, mimeType, size, createdTime, modifiedTime, owners(displayName)"
             ).execute()
             
             output = f"📄 File Information\n"
@@ -179,14 +187,16 @@ def register_tools(mcp: FastMCP):
             if not items:
                 return "No folders found in Google Drive."
             
-            output = f"Found {len(items)} folders in Google Drive:\n\n"
+            parts = [f"Found {len(items)} folders in Google Drive:\n\n"]
             
             for item in items:
-                output += f"📁 {item['name']}\n"
-                output += f"   ID: {item['id']}\n"
-                output += f"   Modified: {item.get('modifiedTime', 'Unknown')}\n\n"
+                parts.append(FOLDER_ENTRY.format(
+                    name=item['name'],
+                    id=item['id'],
+                    modified=item.get('modifiedTime', 'Unknown')
+                ))
             
-            return output
+            return "".join(parts)
             
         except HttpError as error:
             return f"An error occurred: {error}"
@@ -223,15 +233,17 @@ def register_tools(mcp: FastMCP):
             if not items:
                 return f"No files modified in the last {days} days."
             
-            output = f"Files modified in the last {days} days:\n\n"
+            parts = [f"Files modified in the last {days} days:\n\n"]
             
             for item in items:
-                output += f"📄 {item['name']}\n"
-                output += f"   ID: {item['id']}\n"
-                output += f"   Type: {item.get('mimeType', 'Unknown')}\n"
-                output += f"   Modified: {item.get('modifiedTime', 'Unknown')}\n\n"
+                parts.append(FILE_ENTRY.format(
+                    name=item['name'],
+                    id=item['id'],
+                    mime_type=item.get('mimeType', 'Unknown'),
+                    modified=item.get('modifiedTime', 'Unknown')
+                ))
             
-            return output
+            return "".join(parts)
             
         except HttpError as error:
             return f"An error occurred: {error}"
@@ -411,9 +423,11 @@ def register_tools(mcp: FastMCP):
                 return f"📊 Spreadsheet: {file_metadata.get('name')}\nRange: {cell_range}\n\nNo data found in the specified range."
             
             # Format the output as a table
-            output = f"📊 Spreadsheet: {file_metadata.get('name')}\n"
-            output += f"Range: {cell_range}\n"
-            output += f"Data:\n{'='*50}\n"
+            lines = [
+                f"📊 Spreadsheet: {file_metadata.get('name')}\n"
+                f"Range: {cell_range}\n"
+                f"Data:\n{'='*50}\n"
+            ]
             
             # Find the maximum width for each column for better formatting
             col_widths = []
@@ -433,9 +447,9 @@ def register_tools(mcp: FastMCP):
                         formatted_row.append(cell_str.ljust(col_widths[col_idx]))
                     else:
                         formatted_row.append(cell_str)
-                output += " | ".join(formatted_row) + "\n"
+                lines.append(" | ".join(formatted_row) + "\n")
             
-            return output
+            return "".join(lines)
             
         except HttpError as error:
             if error.resp.status == 404:
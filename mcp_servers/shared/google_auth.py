@@ -6,11 +6,19 @@ used by Gmail and Google Drive MCP servers.
 """
 
 import os
+import threading
+from datetime import datetime, timezone
 from typing import Any, Dict
 
+import httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import Resource, build
+from googleapiclient.http import HttpRequest
+
+# Seconds to wait on a Google API connection or response
+HTTP_TIMEOUT = 30
 
 
 class GoogleServiceManager:
@@ -19,31 +27,71 @@ class GoogleServiceManager:
     def __init__(self):
         self._services: Dict[str, Resource] = {}
         self._credentials = None
+        self._credentials_lock = threading.Lock()
+        # Each thread's AuthorizedHttp, as the `http` attribute
+        self._thread_http = threading.local()
     
     def _get_credentials(self) -> Credentials:
         """Get or create Google OAuth credentials."""
-        if self._credentials is None:
-            access_token = os.getenv('GOOGLE_ACCESS_TOKEN')
-            refresh_token = os.getenv('GOOGLE_REFRESH_TOKEN')
-            
-            if not access_token:
-                raise ValueError("GOOGLE_ACCESS_TOKEN environment variable not set")
-            
-            # Create credentials
-            self._credentials = Credentials(
-                token=access_token,
-                refresh_token=refresh_token,
-                token_uri="https://oauth2.googleapis.com/token",
-                client_id=os.getenv('GOOGLE_CLIENT_ID'),
-                client_secret=os.getenv('GOOGLE_CLIENT_SECRET')
-            )
-            
-            # Refresh token if needed
-            if self._credentials.expired and self._credentials.refresh_token:
-                self._credentials.refresh(Request())
-        
+        with self._credentials_lock:
+            if self._credentials is None:
+                self._credentials = self._load_credentials()
         return self._credentials
     
+    def _load_credentials(self) -> Credentials:
+        """Create Google OAuth credentials from the environment."""
+        access_token = os.getenv('GOOGLE_ACCESS_TOKEN')
+        refresh_token = os.getenv('GOOGLE_REFRESH_TOKEN')
+        expires_at = os.getenv('GOOGLE_TOKEN_EXPIRES_AT')
+        
+        if not access_token:
+            raise ValueError("GOOGLE_ACCESS_TOKEN environment variable not set")
+        
+        # With a known expiry the credentials count as expired a few minutes
+        # early, so AuthorizedHttp refreshes them before a call instead of
+        # after the call is rejected (google-auth expects naive UTC)
+        expiry = None
+        if expires_at:
+            expiry = datetime.fromtimestamp(int(expires_at), tz=timezone.utc).replace(tzinfo=None)
+        
+        # Create credentials
+        credentials = Credentials(
+            token=access_token,
+            refresh_token=refresh_token,
+            token_uri="https://oauth2.googleapis.com/token",
+            client_id=os.getenv('GOOGLE_CLIENT_ID'),
+            client_secret=os.getenv('GOOGLE_CLIENT_SECRET'),
+            expiry=expiry
+        )
+        
+        # Refresh token if needed
+        if credentials.expired and credentials.refresh_token:
+            credentials.refresh(Request())
+        
+        return credentials
+    
+    def _get_http(self) -> AuthorizedHttp:
+        """Get or create the calling thread's authorized HTTP client.
+        
+        FastMCP runs sync tools on worker threads and httplib2.Http is not
+        thread-safe, so each thread gets its own; concurrent tool calls then
+        make their Google API requests in parallel. Each keeps its
+        connections open between calls, so only a thread's first call to a
+        host pays for the TLS handshake. AuthorizedHttp refreshes the shared
+        credentials and retries when a call is rejected with 401.
+        """
+        http = getattr(self._thread_http, "http", None)
+        if http is None:
+            http = self._thread_http.http = AuthorizedHttp(
+                self._get_credentials(),
+                http=httplib2.Http(timeout=HTTP_TIMEOUT)
+            )
+        return http
+    
+    def _build_request(self, http, *args, **kwargs) -> HttpRequest:
+        """Request builder for services: send each request with the executing thread's client."""
+        return HttpRequest(self._get_http(), *args, **kwargs)
+    
     def get_service(self, service_name: str, version: str) -> Resource:
         """Get or create a Google API service instance.
         
@@ -57,8 +105,11 @@ class GoogleServiceManager:
         service_key = f"{service_name}_{version}"
         
         if service_key not in self._services:
-            credentials = self._get_credentials()
-            self._services[service_key] = build(service_name, version, credentials=credentials)
+            # Discovery documents ship with the client library; skip the on-disk cache lookup
+            self._services[service_key] = build(
+                service_name, version, http=self._get_http(),
+                requestBuilder=self._build_request, cache_discovery=False
+            )
         
         return self._services[service_key]
     
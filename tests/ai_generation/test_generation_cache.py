@@ -0,0 +1,172 @@
+"""
+Unit tests for the AI generation cache and per-tool test case caching.
+
+Claude is never called: generate_json is replaced by a fake that records
+which tools each prompt asked about, and the cache lives in tmp_path.
+"""
+
+import json
+
+import pytest
+
+from ai_generation import evals_generator
+from ai_generation.cache import get_cache_dir, read_many, write_many
+from ai_generation.evals_generator import (
+    _TEST_CASE_CACHE,
+    _fan_out_test_cases,
+    generate_ai_test_cases,
+)
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Point the cache at a fresh directory for each test."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.delenv("EXPLORE_MCP_CACHE", raising=False)
+    return tmp_path
+
+
+def tool(name, description=None):
+    return {
+        "name": name,
+        "description": description or f"Does {name}",
+        "inputSchema": {"type": "object", "properties": {"a": {"type": "number"}}},
+    }
+
+
+def tool_tests(name):
+    return {
+        "tool": name,
+        "description": f"Does {name}",
+        "test_cases": [{
+            "id": f"{name}_valid",
+            "type": "valid_params",
+            "description": "Valid call",
+            "params": {"a": 1},
+            "expected_result": "success",
+        }],
+    }
+
+
+class FakeAIService:
+    """Answers test case prompts with one test case per requested tool."""
+    
+    def __init__(self, extra_tools=()):
+        self.requests = []
+        self.extra_tools = list(extra_tools)
+    
+    def generate_json(self, prompt, validate=None):
+        tools_json = prompt.split("Here are the tools:\n\n", 1)[1].split("\n\n", 1)[0]
+        names = [info["name"] for info in json.loads(tools_json)]
+        self.requests.append(names)
+        result = [tool_tests(name) for name in names + self.extra_tools]
+        if validate is not None:
+            validate(result)
+        return result
+
+
+@pytest.fixture
+def ai_service(monkeypatch):
+    service = FakeAIService()
+    monkeypatch.setattr(evals_generator, "get_ai_service", lambda: service)
+    return service
+
+
+@pytest.mark.unit
+class TestReadWriteMany:
+    """Test the multi-entry cache helpers."""
+    
+    def test_round_trip(self):
+        """Test values written under their keys are read back by name."""
+        keys = {"add": "k1", "sub": "k2"}
+        write_many("ns", keys, {"add": {"v": 1}, "sub": ["x"]})
+        assert read_many("ns", keys) == {"add": {"v": 1}, "sub": ["x"]}
+    
+    def test_misses_left_out(self):
+        """Test only hits are returned."""
+        write_many("ns", {"add": "k1"}, {"add": 1})
+        assert read_many("ns", {"add": "k1", "sub": "k2"}) == {"add": 1}
+    
+    def test_names_without_key_skipped(self, cache_home):
+        """Test values whose name has no key are not written."""
+        write_many("ns", {"add": "k1"}, {"add": 1, "ghost": 2})
+        assert [path.name for path in get_cache_dir("ns").iterdir()] == ["k1.json"]
+    
+    def test_disabled_cache(self, monkeypatch):
+        """Test EXPLORE_MCP_CACHE=0 disables reads and writes."""
+        write_many("ns", {"add": "k1"}, {"add": 1})
+        monkeypatch.setenv("EXPLORE_MCP_CACHE", "0")
+        assert read_many("ns", {"add": "k1"}) == {}
+        write_many("ns", {"sub": "k2"}, {"sub": 2})
+        assert not (get_cache_dir("ns") / "k2.json").exists()
+
+
+@pytest.mark.unit
+class TestPerToolTestCaseCache:
+    """Test test cases are cached per tool and merged in input order."""
+    
+    def test_only_missing_tools_generated(self, ai_service):
+        """Test a second run only asks Claude about the new tool."""
+        generate_ai_test_cases([tool("add"), tool("sub")])
+        result = generate_ai_test_cases([tool("mul"), tool("add"), tool("sub")])
+        
+        assert ai_service.requests == [["add", "sub"], ["mul"]]
+        assert [entry["tool"] for entry in result] == ["mul", "add", "sub"]
+    
+    def test_all_cached_skips_claude(self, ai_service):
+        """Test an unchanged tool set is served entirely from the cache."""
+        first = generate_ai_test_cases([tool("add"), tool("sub")])
+        second = generate_ai_test_cases([tool("add"), tool("sub")])
+        
+        assert ai_service.requests == [["add", "sub"]]
+        assert second == first
+    
+    def test_changed_tool_regenerated(self, ai_service):
+        """Test editing a tool's definition invalidates only that tool."""
+        generate_ai_test_cases([tool("add"), tool("sub")])
+        generate_ai_test_cases([tool("add", "Adds two numbers"), tool("sub")])
+        
+        assert ai_service.requests == [["add", "sub"], ["add"]]
+    
+    def test_unrequested_tools_returned_but_not_cached(self, ai_service, cache_home):
+        """Test entries for tools Claude wasn't asked about are kept but not cached."""
+        ai_service.extra_tools = ["ghost"]
+        result = generate_ai_test_cases([tool("add")])
+        
+        assert [entry["tool"] for entry in result] == ["add", "ghost"]
+        assert len(list(get_cache_dir(_TEST_CASE_CACHE).iterdir())) == 1
+    
+    def test_duplicates_generated_once(self, ai_service):
+        """Test identical tools are sent once and fanned out to every name."""
+        result = generate_ai_test_cases([tool("add", "Same"), tool("plus", "Same")])
+        
+        assert ai_service.requests == [["add"]]
+        assert [entry["tool"] for entry in result] == ["add", "plus"]
+        assert result[1]["test_cases"][0]["id"] == "plus_valid"
+
+
+@pytest.mark.unit
+class TestFanOutTestCases:
+    """Test test cases are cloned to duplicate tools."""
+    
+    def test_no_duplicates(self):
+        """Test the list is returned unchanged without duplicates."""
+        test_cases = [tool_tests("add")]
+        assert _fan_out_test_cases(test_cases, {}) is test_cases
+    
+    def test_ids_renamed(self):
+        """Test ids prefixed with the representative's name take the duplicate's name."""
+        entry = tool_tests("add")
+        entry["test_cases"].append({**entry["test_cases"][0], "id": "case_2"})
+        
+        result = _fan_out_test_cases([entry], {"add": ["plus", "sum"]})
+        
+        assert [e["tool"] for e in result] == ["add", "plus", "sum"]
+        assert [c["id"] for c in result[1]["test_cases"]] == ["plus_valid", "plus_case_2"]
+        assert [c["id"] for c in result[2]["test_cases"]] == ["sum_valid", "sum_case_2"]
+    
+    def test_representative_untouched(self):
+        """Test cloning doesn't modify the representative's cases."""
+        entry = tool_tests("add")
+        _fan_out_test_cases([entry], {"add": ["plus"]})
+        assert entry == tool_tests("add")
@@ -0,0 +1,198 @@
+"""
+Unit tests for the chat history context window and summarization.
+
+These tests cover which messages are sent to OpenAI for a long history
+and how older messages are replaced by a summary.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from backend.api.chat import (
+    CONTEXT_WINDOW_CHARS,
+    CONTEXT_WINDOW_MESSAGES,
+    SUMMARY_KEEP_MESSAGES,
+    _SUMMARY_PREFIX,
+    _compact_history,
+    _context_window,
+    _History,
+    _recent_messages,
+)
+
+
+def user(content="question"):
+    return {"role": "user", "content": content}
+
+
+def assistant(content="answer"):
+    return {"role": "assistant", "content": content}
+
+
+def tool_round(call_id="call_1", result="result"):
+    """An assistant tool_calls message and its tool result."""
+    return [
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": call_id,
+                "type": "function",
+                "function": {"name": "add", "arguments": "{}"}
+            }]
+        },
+        {"role": "tool", "tool_call_id": call_id, "content": result},
+    ]
+
+
+def summary(text="earlier"):
+    return {"role": "system", "content": _SUMMARY_PREFIX + text}
+
+
+def conversation(turns):
+    """A history of alternating user and assistant messages."""
+    history = _History()
+    for i in range(turns):
+        history.extend([user(f"q{i}"), assistant(f"a{i}")])
+    return history
+
+
+def summarizer(text="S"):
+    """A fake OpenAIService whose completions return text."""
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+    return SimpleNamespace(async_chat_completion=AsyncMock(return_value=response))
+
+
+@pytest.mark.unit
+class TestRecentMessages:
+    """Test which tail of the history fits the context window."""
+    
+    def test_short_history_sent_whole(self):
+        """Test a history within budget is returned unchanged."""
+        history = conversation(3)
+        assert _recent_messages(history) == list(history)
+    
+    def test_message_count_cap(self):
+        """Test the window holds at most CONTEXT_WINDOW_MESSAGES messages."""
+        history = conversation(CONTEXT_WINDOW_MESSAGES)
+        window = _recent_messages(history)
+        assert len(window) == CONTEXT_WINDOW_MESSAGES
+        assert window == list(history)[-CONTEXT_WINDOW_MESSAGES:]
+    
+    def test_char_budget(self):
+        """Test older messages are dropped once the text exceeds the budget."""
+        big = "x" * (CONTEXT_WINDOW_CHARS // 3)
+        history = _History([user(big), assistant(big), user(big), assistant("ok"), user("last")])
+        window = _recent_messages(history)
+        assert window == list(history)[2:]
+        assert sum(len(m["content"]) for m in window) <= CONTEXT_WINDOW_CHARS
+    
+    def test_starts_at_user_message(self):
+        """Test the window never opens with a cut-off tool round."""
+        history = conversation(CONTEXT_WINDOW_MESSAGES // 2 - 1)
+        history.extend([user("use a tool"), *tool_round(), assistant("done")])
+        window = _recent_messages(history)
+        assert window[0]["role"] == "user"
+        assert window[-4:] == list(history)[-4:]
+    
+    def test_over_budget_current_turn_sent_whole(self):
+        """Test a current turn larger than the budget is still sent from its user message."""
+        history = conversation(2)
+        history.extend([user("read it"), *tool_round(result="x" * (CONTEXT_WINDOW_CHARS * 2))])
+        window = _recent_messages(history)
+        assert window == list(history)[-3:]
+
+
+@pytest.mark.unit
+class TestContextWindow:
+    """Test the summary is kept at the start of the context window."""
+    
+    def test_summary_prefixed_to_recent_messages(self):
+        """Test a summary is sent even when it falls outside the recent tail."""
+        history = conversation(CONTEXT_WINDOW_MESSAGES)
+        history.appendleft(summary())
+        window = _context_window(history)
+        assert window[0] is history[0]
+        assert window[1:] == _recent_messages(history)
+    
+    def test_summary_not_duplicated(self):
+        """Test a summary already inside the window is sent once."""
+        history = _History([summary(), user(), assistant()])
+        assert _context_window(history) == [summary(), user(), assistant()]
+    
+    def test_no_summary(self):
+        """Test a history without a summary is just its recent messages."""
+        history = conversation(CONTEXT_WINDOW_MESSAGES)
+        assert _context_window(history) == _recent_messages(history)
+
+
+@pytest.mark.unit
+class TestCompactHistory:
+    """Test older messages are replaced by a summary."""
+    
+    async def test_summary_replaces_older_messages(self):
+        """Test the prefix becomes one summary and the recent tail is kept."""
+        history = conversation(CONTEXT_WINDOW_MESSAGES)
+        original = list(history)
+        service = summarizer("the user asked many questions")
+        
+        await _compact_history(service, history)
+        
+        assert history[0] == summary("the user asked many questions")
+        kept = list(history)[1:]
+        assert kept == original[-len(kept):]
+        assert kept[0]["role"] == "user"
+        assert len(kept) <= SUMMARY_KEEP_MESSAGES
+        assert not history.compacting
+        service.async_chat_completion.assert_awaited_once()
+    
+    async def test_previous_summary_folded_in(self):
+        """Test an earlier summary is part of the new summary's transcript."""
+        history = conversation(CONTEXT_WINDOW_MESSAGES)
+        history.appendleft(summary("first summary"))
+        service = summarizer("second summary")
+        
+        await _compact_history(service, history)
+        
+        transcript = service.async_chat_completion.call_args.kwargs["messages"][1]["content"]
+        assert "first summary" in transcript
+        assert history[0] == summary("second summary")
+        assert sum(1 for m in history if m["role"] == "system") == 1
+    
+    async def test_short_history_untouched(self):
+        """Test a history within the context window is not summarized."""
+        history = conversation(3)
+        original = list(history)
+        service = summarizer()
+        
+        await _compact_history(service, history)
+        
+        assert list(history) == original
+        service.async_chat_completion.assert_not_awaited()
+    
+    async def test_history_cleared_while_summarizing(self):
+        """Test a summary is discarded if the history was cleared meanwhile."""
+        history = conversation(CONTEXT_WINDOW_MESSAGES)
+        service = summarizer()
+        
+        async def clear_then_respond(**kwargs):
+            history.clear()
+            history.append(user("fresh start"))
+            return service.async_chat_completion.return_value
+        
+        service.async_chat_completion.side_effect = clear_then_respond
+        await _compact_history(service, history)
+        
+        assert list(history) == [user("fresh start")]
+    
+    async def test_failed_summary_leaves_history(self):
+        """Test history is unchanged when the summary can't be written."""
+        history = conversation(CONTEXT_WINDOW_MESSAGES)
+        original = list(history)
+        service = summarizer()
+        service.async_chat_completion.side_effect = RuntimeError("API down")
+        
+        await _compact_history(service, history)
+        
+        assert list(history) == original
+        assert not history.compacting
@@ -0,0 +1,84 @@
+"""
+Unit tests for the background event loop used by the Flask views.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from backend.utils.event_loop import BackgroundEventLoop
+
+
+@pytest.fixture
+def event_loop_thread():
+    loop = BackgroundEventLoop()
+    yield loop
+    loop.close(timeout=5)
+
+
+@pytest.mark.unit
+class TestBackgroundEventLoop:
+    """Test coroutines run on the loop thread with a time limit."""
+    
+    def test_returns_result(self, event_loop_thread):
+        """Test run() returns the coroutine's result."""
+        async def answer():
+            return threading.current_thread().name
+        
+        assert event_loop_thread.run(answer()) == "backend-event-loop"
+    
+    def test_reraises_exception(self, event_loop_thread):
+        """Test the coroutine's exception is raised in the caller."""
+        async def fail():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError, match="boom"):
+            event_loop_thread.run(fail())
+    
+    def test_timeout_raises_builtin_timeout_error(self, event_loop_thread):
+        """Test a slow coroutine raises the builtin TimeoutError on every Python version."""
+        with pytest.raises(TimeoutError):
+            event_loop_thread.run(asyncio.sleep(5), timeout=0.05)
+    
+    def test_timeout_cancels_coroutine(self, event_loop_thread):
+        """Test the timed-out coroutine is cancelled, not left running."""
+        cancelled = threading.Event()
+        
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        with pytest.raises(TimeoutError):
+            event_loop_thread.run(slow(), timeout=0.05)
+        assert cancelled.wait(1)
+    
+    def test_loop_reused(self, event_loop_thread):
+        """Test every call runs on the same loop."""
+        async def current_loop():
+            return asyncio.get_running_loop()
+        
+        assert event_loop_thread.run(current_loop()) is event_loop_thread.run(current_loop())
+    
+    def test_close_cancels_pending_work(self):
+        """Test close() cancels submitted coroutines still running."""
+        loop = BackgroundEventLoop()
+        cancelled = threading.Event()
+        started = threading.Event()
+        
+        async def forever():
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        loop.submit(forever())
+        assert started.wait(1)
+        loop.close(timeout=5)
+        
+        assert cancelled.is_set()
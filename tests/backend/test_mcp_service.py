@@ -0,0 +1,219 @@
+"""
+Unit tests for MCPService session pooling and tool call caching.
+
+Server processes are never started: the transport and ClientSession are
+replaced by fakes that record what was opened, closed and called.
+"""
+
+import asyncio
+import dataclasses
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from mcp.types import TextContent
+
+from backend.services import mcp_service as mcp_service_module
+from backend.services.mcp_service import MCPService
+
+
+class FakeTokenStore:
+    """In-memory stand-in for TokenStore."""
+    
+    def __init__(self, tokens=None):
+        self.tokens = dict(tokens or {})
+    
+    def get_tokens(self, server_name):
+        tokens = self.tokens.get(server_name)
+        return dict(tokens) if tokens else None
+    
+    def is_token_expired(self, server_name, buffer_seconds=300, tokens=None):
+        if tokens is None:
+            tokens = self.get_tokens(server_name)
+        return not tokens or time.time() > tokens["expires_at"] - buffer_seconds
+
+
+class FakeClientSession:
+    """Stand-in for mcp.ClientSession that answers every tool call."""
+    
+    def __init__(self, read, write):
+        self.transport = read
+        self.calls = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    async def initialize(self):
+        pass
+    
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        return SimpleNamespace(content=[TextContent(type="text", text=f"{name} {len(self.calls)}")])
+
+
+def google_tokens(access_token):
+    return {"access_token": access_token, "refresh_token": "refresh", "expires_at": time.time() + 3600}
+
+
+@pytest.fixture
+def transports():
+    """Record of every transport opened by the service under test."""
+    return []
+
+
+@pytest.fixture
+async def service(monkeypatch, transports):
+    """An MCPService whose connections go to fakes, closed after the test."""
+    monkeypatch.setattr(mcp_service_module, "ClientSession", FakeClientSession)
+    service = MCPService(FakeTokenStore(), oauth_handler=None)
+    
+    @asynccontextmanager
+    async def fake_transport(server_config, env):
+        transport = SimpleNamespace(server=server_config.key, env=env, closed=False)
+        transports.append(transport)
+        try:
+            yield transport, None
+        finally:
+            transport.closed = True
+    
+    monkeypatch.setattr(service, "_create_client_session", fake_transport)
+    yield service
+    await service.aclose()
+
+
+@pytest.mark.unit
+class TestSessionPool:
+    """Test sessions are opened once and reused."""
+    
+    async def test_session_reused(self, service, transports):
+        """Test repeat lookups return the same session over one transport."""
+        first = await service._get_session("air-fryer")
+        second = await service._get_session("air-fryer")
+        
+        assert first is second
+        assert len(transports) == 1
+    
+    async def test_concurrent_lookups_share_one_connection(self, service, transports):
+        """Test simultaneous first uses open a single connection."""
+        sessions = await asyncio.gather(*(service._get_session("air-fryer") for _ in range(5)))
+        
+        assert all(session is sessions[0] for session in sessions)
+        assert len(transports) == 1
+    
+    async def test_reconnect_when_token_changes(self, service, transports):
+        """Test a refreshed access token replaces the session and its process."""
+        service.token_store.tokens["gmail"] = google_tokens("token-1")
+        first = await service._get_session("gmail")
+        
+        service.token_store.tokens["gmail"] = google_tokens("token-2")
+        second = await service._get_session("gmail")
+        
+        assert second is not first
+        assert [t.env["GOOGLE_ACCESS_TOKEN"] for t in transports] == ["token-1", "token-2"]
+        assert transports[0].closed and not transports[1].closed
+    
+    async def test_auth_server_without_tokens_refused(self, service, transports):
+        """Test an auth server with no tokens is never started."""
+        assert await service.get_server_env("gmail") is None
+        with pytest.raises(ValueError):
+            await service._get_session("gmail")
+        assert transports == []
+    
+    async def test_aclose_closes_transports(self, service, transports):
+        """Test closing the service closes every pooled connection."""
+        await service._get_session("air-fryer")
+        await service._get_session("calculator")
+        
+        await service.aclose()
+        
+        assert all(transport.closed for transport in transports)
+        assert service.sessions == {}
+    
+    async def test_disconnect_forgets_server(self, service, transports):
+        """Test disconnecting closes the session and drops the server's tools."""
+        service.token_store.tokens["gmail"] = google_tokens("token-1")
+        await service._get_session("gmail")
+        service.tool_registry.update({"list_messages": "gmail", "add": "calculator"})
+        
+        await service.disconnect_server("gmail")
+        
+        assert transports[0].closed
+        assert "gmail" not in service.sessions
+        assert service.tool_registry == {"add": "calculator"}
+
+
+@pytest.mark.unit
+class TestToolResultCache:
+    """Test results of cacheable tools are reused, least recently used evicted first."""
+    
+    @pytest.fixture
+    def cached_service(self, service):
+        """Make air-fryer's "cook" tool cacheable and routable."""
+        config = service.servers["air-fryer"]
+        service.servers["air-fryer"] = dataclasses.replace(config, cacheable_tools=frozenset({"cook"}))
+        service.tool_registry["cook"] = "air-fryer"
+        service.tool_registry["status"] = "air-fryer"
+        return service
+    
+    async def call(self, service, tool_name, raw_arguments):
+        return await service.call_tool(tool_name, {}, raw_arguments=raw_arguments)
+    
+    async def test_cache_hit(self, cached_service):
+        """Test a repeat call with the same arguments skips the server."""
+        first = await self.call(cached_service, "cook", '{"minutes":5}')
+        second = await self.call(cached_service, "cook", '{"minutes":5}')
+        
+        assert first == second == "cook 1"
+        assert len(cached_service.sessions["air-fryer"].calls) == 1
+    
+    async def test_different_arguments_miss(self, cached_service):
+        """Test other arguments are sent to the server."""
+        await self.call(cached_service, "cook", '{"minutes":5}')
+        assert await self.call(cached_service, "cook", '{"minutes":6}') == "cook 2"
+    
+    async def test_uncacheable_tool_always_called(self, cached_service):
+        """Test tools not marked cacheable are called every time."""
+        await self.call(cached_service, "status", "{}")
+        assert await self.call(cached_service, "status", "{}") == "status 2"
+    
+    async def test_least_recently_used_evicted(self, cached_service):
+        """Test the oldest unused result is dropped once the cache is full."""
+        cached_service.TOOL_RESULT_CACHE_SIZE = 2
+        await self.call(cached_service, "cook", '{"minutes":1}')
+        await self.call(cached_service, "cook", '{"minutes":2}')
+        await self.call(cached_service, "cook", '{"minutes":1}')  # hit; now most recent
+        await self.call(cached_service, "cook", '{"minutes":3}')  # evicts minutes=2
+        
+        calls = cached_service.sessions["air-fryer"].calls
+        assert len(calls) == 3
+        assert await self.call(cached_service, "cook", '{"minutes":1}') == "cook 1"
+        assert await self.call(cached_service, "cook", '{"minutes":2}') == "cook 4"
+
+
+@pytest.mark.unit
+class TestLocalTools:
+    """Test a server's local_tools run in-process."""
+    
+    async def test_local_tool_skips_server_process(self, service, transports):
+        """Test calculator tools are answered without opening a session."""
+        result = await service.call_tool("add", {"a": 2, "b": 3}, server_key="calculator")
+        
+        assert result == "The sum of 2.0 and 3.0 is 5.0"
+        assert transports == []
+    
+    async def test_local_result_cached(self, service, monkeypatch):
+        """Test cacheable local tools are also answered from the result cache."""
+        await service.call_tool("add", {"a": 2, "b": 3}, server_key="calculator", raw_arguments='{"a":2,"b":3}')
+        
+        local_server = service._local_server("calculator")
+        
+        async def fail(*args, **kwargs):
+            raise AssertionError("cached result not used")
+        
+        monkeypatch.setattr(local_server, "call_tool", fail)
+        result = await service.call_tool("add", {"a": 2, "b": 3}, server_key="calculator", raw_arguments='{"a":2,"b":3}')
+        assert result == "The sum of 2.0 and 3.0 is 5.0"
@@ -0,0 +1,102 @@
+"""
+Unit tests for TokenStore's write-through token cache.
+"""
+
+import sqlite3
+
+import pytest
+
+from backend.auth.token_store import TokenStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "tokens.db"
+
+
+@pytest.fixture
+def store(db_path):
+    store = TokenStore(db_path)
+    yield store
+    store.close()
+
+
+def oauth_tokens(access_token="access-1"):
+    return {"access_token": access_token, "refresh_token": "refresh", "expires_in": 3600, "scope": "a b"}
+
+
+def write_directly(db_path, access_token):
+    """Change the stored access token behind the store's back."""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE tokens SET access_token = ?", (access_token,))
+
+
+@pytest.mark.unit
+class TestTokenStoreCache:
+    """Test reads are served from the cache and writes go through it."""
+    
+    def test_round_trip(self, store):
+        """Test saved tokens are read back decoded."""
+        store.save_tokens("gmail", oauth_tokens())
+        tokens = store.get_tokens("gmail")
+        
+        assert tokens["access_token"] == "access-1"
+        assert tokens["refresh_token"] == "refresh"
+        assert tokens["scopes"] == ["a", "b"]
+        assert not store.is_token_expired("gmail", tokens=tokens)
+    
+    def test_reads_served_from_cache(self, store, db_path):
+        """Test a second read doesn't go back to the database."""
+        store.save_tokens("gmail", oauth_tokens())
+        store.get_tokens("gmail")
+        write_directly(db_path, "changed-elsewhere")
+        
+        assert store.get_tokens("gmail")["access_token"] == "access-1"
+    
+    def test_cache_filled_from_database(self, store, db_path):
+        """Test tokens saved by an earlier store are loaded on first read."""
+        store.save_tokens("gmail", oauth_tokens())
+        store.close()
+        
+        reopened = TokenStore(db_path)
+        try:
+            assert reopened.get_tokens("gmail")["access_token"] == "access-1"
+        finally:
+            reopened.close()
+    
+    def test_save_writes_through(self, store, db_path):
+        """Test saving updates both the cache and the database."""
+        store.save_tokens("gmail", oauth_tokens())
+        store.get_tokens("gmail")
+        store.save_tokens("gmail", oauth_tokens("access-2"))
+        
+        assert store.get_tokens("gmail")["access_token"] == "access-2"
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT access_token FROM tokens").fetchone() == ("access-2",)
+    
+    def test_delete_writes_through(self, store):
+        """Test deleted tokens are gone from the cache and the database."""
+        store.save_tokens("gmail", oauth_tokens())
+        store.delete_tokens("gmail")
+        
+        assert store.get_tokens("gmail") is None
+        assert store.is_token_expired("gmail")
+        assert store.list_servers() == []
+    
+    def test_missing_tokens_cached(self, store, db_path):
+        """Test a miss is remembered too."""
+        assert store.get_tokens("gmail") is None
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                "INSERT INTO tokens (server_name, access_token, expires_at, created_at, updated_at) "
+                "VALUES ('gmail', 'elsewhere', 0, 0, 0)"
+            )
+        
+        assert store.get_tokens("gmail") is None
+    
+    def test_returned_tokens_are_copies(self, store):
+        """Test callers can't modify the cached tokens."""
+        store.save_tokens("gmail", oauth_tokens())
+        store.get_tokens("gmail")["access_token"] = "tampered"
+        
+        assert store.get_tokens("gmail")["access_token"] == "access-1"